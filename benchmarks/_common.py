@@ -0,0 +1,178 @@
+"""基准脚本共用工具：按文件路径加载工具脚本、合成测试 PDF (单栏 / 双栏 / 扫描 / 混排 / 超长) 与固定种子的基准语料、
+合成术语 / 翻译导出 CSV、读取进程峰值内存"""
+import os
+import sys
+import csv
+import random
+import importlib.util
+
+import fitz  # PyMuPDF
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ("the of and translation memory segment alignment corpus language model quality review "
+         "terminology glossary context fuzzy match engine workflow project client deadline").split()
+
+def load_tool(filename):
+    """工具脚本文件名含连字符无法直接 import，这里按路径加载为模块 (工具脚本依赖的 pdf_core 从仓库根目录导入)"""
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    path = os.path.join(ROOT_DIR, filename)
+    name = "bench_" + os.path.splitext(filename)[0].replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存 (MB)"""
+    try:
+        import resource
+    except ImportError:  # Windows 没有 resource 模块，改用 psutil 的峰值工作集 (其他平台的 psutil 只有当前 RSS)
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def random_paragraph(rng, words=60):
+    w = [rng.choice(WORDS) for _ in range(words)]
+    w[0] = w[0].capitalize()
+    return " ".join(w) + "."
+
+def make_text_page(doc, rng, paragraphs=4):
+    """生成一页带页眉、页码的单栏文本页"""
+    page = doc.new_page()
+    page.insert_text((72, 30), "Journal of Localization Studies", fontsize=9)
+    page.insert_text((290, 820), str(len(doc)), fontsize=9)
+    y = 100
+    for _ in range(paragraphs):
+        page.insert_textbox(fitz.Rect(72, y, 520, y + 160), random_paragraph(rng), fontsize=10)
+        y += 170
+    return page
+
+def make_two_column_page(doc, rng, paragraphs=3, title=True):
+    """生成一页双栏论文版式：可选通栏标题，左右两栏各若干段落，页眉与页码在边缘"""
+    page = doc.new_page()
+    page.insert_text((72, 30), "Journal of Localization Studies", fontsize=9)
+    page.insert_text((290, 820), str(len(doc)), fontsize=9)
+    y_start = 100
+    if title:
+        page.insert_textbox(fitz.Rect(50, 60, 545, 90), random_paragraph(rng, words=10), fontsize=12)
+    for x0, x1 in ((50, 290), (310, 545)):
+        y = y_start
+        for _ in range(paragraphs):
+            height = rng.randint(120, 200)
+            page.insert_textbox(fitz.Rect(x0, y, x1, y + height), random_paragraph(rng, words=rng.randint(35, 60)), fontsize=9)
+            y += height + rng.choice((8, 10, 14))
+    return page
+
+def make_two_column_pdf(path, pages, seed=0):
+    """生成双栏论文版式的文本层 PDF，约三分之一的页面带通栏标题"""
+    rng = random.Random(seed)
+    out = fitz.open()
+    for _ in range(pages):
+        make_two_column_page(out, rng, paragraphs=rng.randint(2, 4), title=rng.random() < 0.33)
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    return path
+
+def make_scanned_pdf(path, pages, seed=0, dpi=150):
+    """生成纯图片 (无文本层) 的扫描件 PDF：先排版文本页，再光栅化后作为整页图片插入"""
+    rng = random.Random(seed)
+    out = fitz.open()
+    for _ in range(pages):
+        src = fitz.open()
+        page = make_text_page(src, rng)
+        pix = page.get_pixmap(dpi=dpi)
+        scan = out.new_page(width=page.rect.width, height=page.rect.height)
+        scan.insert_image(scan.rect, pixmap=pix)
+        src.close()
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    return path
+
+def make_mixed_pdf(path, pages, scan_ratio=0.2, seed=0, dpi=150):
+    """生成文本页与扫描页混排的 PDF，扫描页按 scan_ratio 随机穿插"""
+    rng = random.Random(seed)
+    out = fitz.open()
+    for _ in range(pages):
+        if rng.random() < scan_ratio:
+            src = fitz.open()
+            pix = make_text_page(src, rng).get_pixmap(dpi=dpi)
+            scan = out.new_page(width=src[0].rect.width, height=src[0].rect.height)
+            scan.insert_image(scan.rect, pixmap=pix)
+            src.close()
+        else:
+            make_text_page(out, rng, paragraphs=rng.randint(2, 5))
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    return path
+
+def make_text_pdf(path, pages, seed=0):
+    """生成单栏文本层 PDF"""
+    rng = random.Random(seed)
+    out = fitz.open()
+    for _ in range(pages):
+        make_text_page(out, rng, paragraphs=rng.randint(2, 5))
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    return path
+
+def make_long_pdf(path, pages, seed=0):
+    """生成超长文本层 PDF：单栏与双栏页交替出现 (不含扫描页，页数再大也不依赖 Tesseract)"""
+    rng = random.Random(seed)
+    out = fitz.open()
+    for _ in range(pages):
+        if rng.random() < 0.5:
+            make_text_page(out, rng, paragraphs=rng.randint(2, 5))
+        else:
+            make_two_column_page(out, rng, paragraphs=rng.randint(2, 4), title=rng.random() < 0.33)
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    return path
+
+# 基准语料：名称 -> (生成函数, 默认页数, 是否需要 OCR)；--scale 按比例缩放页数。
+# 生成函数保存时不写随机文档 ID (no_new_id)，同一种子与页数生成的文件逐字节一致
+CORPUS = {
+    "text": (make_text_pdf, 200, False),
+    "two-column": (make_two_column_pdf, 200, False),
+    "scanned": (make_scanned_pdf, 20, True),
+    "mixed": (make_mixed_pdf, 200, True),
+    "long": (make_long_pdf, 3000, False),
+}
+
+def build_corpus(corpus_dir, names=None, scale=1.0, seed=0):
+    """按固定种子生成基准语料 (同名同参数的文件已存在时直接复用)，返回 [(名称, 路径, 页数, 是否需要 OCR)]"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = []
+    for name in names or CORPUS:
+        make, default_pages, needs_ocr = CORPUS[name]
+        pages = max(1, int(default_pages * scale))
+        path = os.path.join(corpus_dir, f"{name}-{pages}p-seed{seed}.pdf")
+        if not os.path.exists(path):
+            make(path + ".tmp", pages, seed=seed)
+            os.replace(path + ".tmp", path)
+        corpus.append((name, path, pages, needs_ocr))
+    return corpus
+
+def make_segment_csv(path, rows, columns=10, seed=0, nan_ratio=0.05, max_words=12):
+    """生成 TMS 导出风格的 CSV：首列整数编号，其后文本列 (原文 / 译文 / 备注) 与数值列交替，按 nan_ratio 留空"""
+    rng = random.Random(seed)
+    header = ["id"] + [f"{'score' if k % 4 == 3 else 'text'}_{k}" for k in range(1, columns)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            row = [i]
+            for k in range(1, columns):
+                if rng.random() < nan_ratio:
+                    row.append("")
+                elif k % 4 == 3:
+                    row.append(round(rng.random() * 100, 2))
+                else:
+                    row.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, max_words))))
+            writer.writerow(row)
+    return path
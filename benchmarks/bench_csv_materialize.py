@@ -0,0 +1,77 @@
+"""
+CSV 转 Word 行数据准备基准：逐行 iterrows() + row.iloc[] + pd.isna() vs 整块向量化 materialize_rows()
+
+语料为合成的 TMS 导出 CSV (默认 200,000 行 × 10 列，含空值)；两种方案按分卷逐块计时，并逐块比对结果一致。
+建表耗时 (默认的快速写表) 按 --build-rows 行的样本线性外推到全量，
+用来给出 pandas 取值在 (取值 + 建表) 中所占的比例。
+用法: python benchmarks/bench_csv_materialize.py [--rows 200000] [--columns 10] [--build-rows 200] [--csv 现有.csv]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+from _common import load_tool, make_segment_csv
+
+CHUNK_SIZE = 5000  # 与 csv_to_word_gui 默认预算下 10 列数据的分卷行数一致
+
+def legacy_rows(chunk_df):
+    """旧路径：逐行 iterrows()，逐格 row.iloc[] 取值并 pd.isna() 判空"""
+    rows = []
+    for _, row in chunk_df.iterrows():
+        values = []
+        for col_idx in range(len(chunk_df.columns)):
+            cell_value = row.iloc[col_idx]
+            if pd.isna(cell_value):
+                cell_value = ""
+            values.append(str(cell_value))
+        rows.append(values)
+    return rows
+
+def time_chunks(df, materializers):
+    """按分卷行数逐块运行各实现并累计耗时，每块比对结果一致"""
+    totals = [0.0] * len(materializers)
+    for start_idx in range(0, len(df), CHUNK_SIZE):
+        chunk_df = df.iloc[start_idx:start_idx + CHUNK_SIZE]
+        results = []
+        for k, materialize in enumerate(materializers):
+            start = time.perf_counter()
+            results.append(materialize(chunk_df))
+            totals[k] += time.perf_counter() - start
+        assert all(r == results[0] for r in results), f"第 {start_idx} 行起的分块结果不一致"
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="合成 CSV 的行数")
+    parser.add_argument("--columns", type=int, default=10, help="合成 CSV 的列数")
+    parser.add_argument("--build-rows", type=int, default=200, help="建表计时的样本行数 (按行外推到全量)")
+    parser.add_argument("--csv", help="使用现有 CSV 代替合成语料")
+    args = parser.parse_args()
+
+    tool = load_tool("csv_to_word_gui.py")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv or make_segment_csv(os.path.join(tmp, "segments.csv"), args.rows, args.columns)
+        start = time.perf_counter()
+        df = pd.read_csv(csv_path)
+        read_sec = time.perf_counter() - start
+    columns = df.columns.tolist()
+    print(f"语料: {len(df)} 行 × {len(columns)} 列，read_csv 用时 {read_sec:.2f}s")
+
+    implementations = (("iterrows", legacy_rows), ("vectorized", tool.materialize_rows))
+    totals = time_chunks(df, [materialize for _, materialize in implementations])
+    print("一致性校验通过")
+
+    sample = tool.materialize_rows(df.iloc[:args.build_rows])
+    start = time.perf_counter()
+    tool.CSVtoWordApp.build_document(columns, sample)
+    build_sec = (time.perf_counter() - start) * len(df) / max(len(sample), 1)
+
+    print(f"{'实现':<14}{'取值(s)':>10}{'建表(s, 外推)':>16}{'pandas 占比':>12}")
+    for (name, _), sec in zip(implementations, totals):
+        print(f"{name:<14}{sec:>10.2f}{build_sec:>16.1f}{sec / (sec + build_sec):>12.2%}")
+
+if __name__ == "__main__":
+    main()
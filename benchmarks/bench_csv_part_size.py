@@ -0,0 +1,97 @@
+"""
+CSV 转 Word 分卷大小基准：分卷行数与生成耗时、打开耗时的关系，以及按预算切分在不同形状 CSV 上的结果
+
+第一部分用同一份合成语料生成不同行数的分卷 (快速写表)，记录生成 (建表 + 保存) 耗时、docx 大小与打开耗时：
+python-docx 解析耗时始终测量；--word 时另用 Word 打开并完成分页 (需要 Windows + Word + pywin32)。
+第二部分把 词汇表 (2 列短文本) / 句段表 (10 列) / 宽表长译文 (40 列) 三种形状按 convert_csv 的预算切分，
+与原先固定 5000 行一卷对比分卷数与每卷的单元格数、文字量，并测量每种形状最大分卷的生成与打开耗时。
+用法: python benchmarks/bench_csv_part_size.py [--part-rows 1000 2500 5000 10000 20000] [--columns 10] [--shape-rows 20000] [--word]
+"""
+import os
+import math
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+from _common import load_tool, make_segment_csv
+
+LEGACY_PART_ROWS = 5000  # 原先固定的分卷行数
+SHAPES = (  # (名称, 列数, 每格最多词数)
+    ("词汇表", 2, 4),
+    ("句段表", 10, 12),
+    ("宽表长译文", 40, 40),
+)
+
+def word_open_sec(path):
+    """用 Word 打开文档并完成分页的耗时；没有 pywin32 / Word 时返回 None"""
+    try:
+        import win32com.client
+    except ImportError:
+        return None
+    word = win32com.client.DispatchEx("Word.Application")
+    word.Visible = False
+    try:
+        start = time.perf_counter()
+        doc = word.Documents.Open(os.path.abspath(path), ReadOnly=True)
+        doc.ComputeStatistics(2)  # wdStatisticPages：强制完成整篇排版
+        elapsed = time.perf_counter() - start
+        doc.Close(False)
+        return elapsed
+    finally:
+        word.Quit()
+
+def measure_part(tool, columns, rows, out_path, use_word):
+    """生成并保存一个分卷，返回 (生成耗时, docx KB, python-docx 打开耗时, Word 打开耗时或 None)"""
+    start = time.perf_counter()
+    tool.build_part(columns, rows, True, out_path)
+    build_sec = time.perf_counter() - start
+    start = time.perf_counter()
+    tool.Document(out_path)
+    open_sec = time.perf_counter() - start
+    return build_sec, os.path.getsize(out_path) / 1024, open_sec, word_open_sec(out_path) if use_word else None
+
+def format_word(sec):
+    return f"{sec:>10.2f}" if sec is not None else f"{'-':>10}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--part-rows", type=int, nargs="+", default=[1000, 2500, 5000, 10000, 20000], help="参与计时的分卷行数")
+    parser.add_argument("--columns", type=int, default=10, help="第一部分合成 CSV 的列数")
+    parser.add_argument("--shape-rows", type=int, default=20000, help="第二部分每种形状的行数")
+    parser.add_argument("--word", action="store_true", help="另测 Word 打开并分页的耗时 (Windows + pywin32)")
+    args = parser.parse_args()
+
+    tool = load_tool("csv_to_word_gui.py")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = make_segment_csv(os.path.join(tmp, "segments.csv"), max(args.part_rows), args.columns)
+        df = pd.read_csv(csv_path)
+        columns = df.columns.tolist()
+        print(f"分卷大小 ({args.columns} 列):")
+        print(f"{'行数':>8}{'单元格':>10}{'文字量':>12}{'生成(s)':>10}{'每万格(s)':>11}{'大小(KB)':>10}{'解析(s)':>10}{'Word(s)':>10}")
+        for part_rows in args.part_rows:
+            rows = tool.materialize_rows(df.iloc[:part_rows])
+            build_sec, size_kb, open_sec, word_sec = measure_part(tool, columns, rows, os.path.join(tmp, "part.docx"), args.word)
+            cells = len(rows) * len(columns)
+            chars = sum(len(value) for row in rows for value in row)
+            print(f"{len(rows):>8}{cells:>10}{chars:>12}{build_sec:>10.2f}{build_sec * 10000 / cells:>11.3f}"
+                  f"{size_kb:>10.0f}{open_sec:>10.2f}{format_word(word_sec)}")
+
+        print(f"\n按预算切分 (每卷 ≤ {tool.PART_CELL_BUDGET} 格 / ≤ {tool.PART_TEXT_BUDGET} 字) vs 固定 {LEGACY_PART_ROWS} 行:")
+        print(f"{'形状':<12}{'分卷':>6}{'固定分卷':>10}{'每卷行数':>10}{'最大单元格':>12}{'最大文字量':>12}"
+              f"{'生成(s)':>10}{'解析(s)':>10}{'Word(s)':>10}")
+        for name, column_count, max_words in SHAPES:
+            shape_csv = make_segment_csv(os.path.join(tmp, f"shape_{column_count}.csv"), args.shape_rows, column_count,
+                                         max_words=max_words)
+            total_rows, dtypes = tool.scan_csv(shape_csv)
+            parts = list(tool.iter_parts(shape_csv, dtypes))
+            part_columns, largest = max(parts, key=lambda part: sum(len(value) for row in part[1] for value in row))
+            build_sec, _, open_sec, word_sec = measure_part(tool, part_columns, largest, os.path.join(tmp, "shape.docx"), args.word)
+            print(f"{name:<12}{len(parts):>6}{math.ceil(total_rows / LEGACY_PART_ROWS):>10}{total_rows / len(parts):>10.0f}"
+                  f"{max(len(rows) for _, rows in parts) * column_count:>12}"
+                  f"{max(sum(len(value) for row in rows for value in row) for _, rows in parts):>12}"
+                  f"{build_sec:>10.2f}{open_sec:>10.2f}{format_word(word_sec)}")
+
+if __name__ == "__main__":
+    main()
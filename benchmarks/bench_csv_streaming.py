@@ -0,0 +1,110 @@
+"""
+CSV 转 Word 流式读取校验：用合成的超大 CSV (默认 5,000,000 行 × 10 列) 跑完整转换流程，断言峰值常驻内存与输入大小无关
+
+convert_csv 在独立子进程中先后处理参照规模 (--reference-rows) 与完整规模的同一份语料，子进程结束时回报自身峰值 RSS；
+完整规模比参照规模多出的峰值超过 --rss-margin-mb (或超过 --rss-limit-mb) 时以非零退出码结束，可直接用作回归检查。
+--full-load 额外测量旧路径一次性 read_csv 整个文件的峰值 (仅读入，不生成文档)，作为对照。
+合成语料缓存在 --corpus-dir 中重复使用；分卷文档写入临时目录，结束后删除。
+用法: python benchmarks/bench_csv_streaming.py [--rows 5000000] [--reference-rows 50000] [--workers 1] [--rss-margin-mb 64]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from _common import load_tool, make_segment_csv, peak_rss_mb
+
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "csv-bench-corpus")
+
+def run_child(csv_path, mode, workers):
+    """子进程入口：流式转换 (或旧路径整表读入)，最后一行输出 JSON (读入行数、分卷数、峰值 RSS)"""
+    tool = load_tool("csv_to_word_gui.py")
+    if mode == "full-load":
+        rows, parts = len(tool.pd.read_csv(csv_path)), None
+    else:
+        rows = tool.scan_csv(csv_path)[0]
+        parts = tool.convert_csv(csv_path, part_workers=workers)
+    print(json.dumps(dict(rows=rows, parts=parts, peak_rss_mb=peak_rss_mb())))
+
+def measure(csv_path, mode, workers, out_dir):
+    """把语料链接到 out_dir 后在子进程中运行 (分卷写在 CSV 所在目录)，返回 (结果, 用时)；失败时结果为 None"""
+    os.makedirs(out_dir, exist_ok=True)
+    link_path = os.path.join(out_dir, os.path.basename(csv_path))
+    try:
+        os.symlink(os.path.abspath(csv_path), link_path)
+    except OSError:
+        shutil.copyfile(csv_path, link_path)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", link_path, mode, str(workers)],
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(out_dir, ignore_errors=True)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        sys.stderr.write(proc.stderr)
+        return None, elapsed
+    return json.loads(proc.stdout.strip().splitlines()[-1]), elapsed
+
+def corpus_csv(corpus_dir, rows, columns, seed):
+    """取缓存的合成语料，不存在时生成 (先写临时文件，中断不会留下半个语料)"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    path = os.path.join(corpus_dir, f"segments_{rows}x{columns}_s{seed}.csv")
+    if not os.path.exists(path):
+        make_segment_csv(path + ".tmp", rows, columns, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        return run_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000000, help="完整规模的行数")
+    parser.add_argument("--reference-rows", type=int, default=50000, help="参照规模的行数")
+    parser.add_argument("--columns", type=int, default=10, help="合成 CSV 的列数")
+    parser.add_argument("--seed", type=int, default=0, help="语料生成种子")
+    parser.add_argument("--workers", type=int, default=1, help="分卷生成进程数")
+    parser.add_argument("--rss-margin-mb", type=float, default=64, help="完整规模相对参照规模允许多出的峰值 RSS")
+    parser.add_argument("--rss-limit-mb", type=float, help="完整规模峰值 RSS 的绝对上限 (可选)")
+    parser.add_argument("--full-load", action="store_true", help="另测旧路径整表 read_csv 的峰值 (内存需求随文件增长)")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help=f"语料缓存目录 (默认: {DEFAULT_CORPUS_DIR})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sizes = (("参照", args.reference_rows), ("完整", args.rows))
+    paths = [corpus_csv(args.corpus_dir, rows, args.columns, args.seed) for _, rows in sizes]
+    print(f"语料: {', '.join(f'{rows} 行 {os.path.getsize(p) / 1024 / 1024:.0f} MB' for (_, rows), p in zip(sizes, paths))}，"
+          f"准备用时 {time.perf_counter() - start:.1f}s")
+
+    runs = [(name, rows, path, "stream") for (name, rows), path in zip(sizes, paths)]
+    if args.full_load:
+        runs.append(("整表读入", args.rows, paths[1], "full-load"))
+
+    print(f"{'规模':<10}{'行数':>10}{'分卷':>8}{'用时(s)':>10}{'峰值RSS(MB)':>14}")
+    peaks, failed = {}, False
+    with tempfile.TemporaryDirectory() as tmp:
+        for k, (name, rows, path, mode) in enumerate(runs):
+            result, elapsed = measure(path, mode, args.workers, os.path.join(tmp, str(k)))
+            if result is None or result["rows"] != rows or result["parts"] == 0:
+                failed = True
+                print(f"{name:<10}{rows:>10}  失败")
+                continue
+            peaks[name] = result["peak_rss_mb"]
+            parts = result["parts"] if result["parts"] is not None else "-"
+            print(f"{name:<10}{rows:>10}{parts:>8}{elapsed:>10.1f}{result['peak_rss_mb']:>14.1f}")
+
+    if "参照" in peaks and "完整" in peaks:
+        growth = peaks["完整"] - peaks["参照"]
+        over_limit = args.rss_limit_mb is not None and peaks["完整"] > args.rss_limit_mb
+        if growth > args.rss_margin_mb or over_limit:
+            failed = True
+            print(f"❌ 峰值 RSS 随输入增长 {growth:+.1f} MB (允许 {args.rss_margin_mb:.0f} MB)")
+        else:
+            print(f"✅ 峰值 RSS 与输入大小无关: 行数 ×{args.rows / args.reference_rows:.0f}，峰值 {growth:+.1f} MB")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+CSV 转 Word 写表基准：逐格 python-docx 写入 (table.cell + 每个 run 直接设置字体) vs 快速写表 (整表 XML 批量生成 + 字符样式)
+
+每种模式在独立子进程中生成并保存一个分卷文档，记录建表 / 保存耗时、进程峰值 RSS 与 docx 大小，
+并比对两种模式各单元格的文字 (含制表符、换行) 是否一致。逐格写入随行数超线性变慢，默认只用少量行对比；
+--fast-rows 另用快速写表跑一个完整分卷。
+用法: python benchmarks/bench_csv_table.py [--rows 100] [--fast-rows 5000] [--columns 10] [--csv 现有.csv]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import pandas as pd
+
+from _common import load_tool, make_segment_csv, peak_rss_mb
+
+def cell_texts(docx_path):
+    """读取文档中表格各单元格的文字"""
+    from docx import Document
+    tbl = Document(docx_path).tables[0]._tbl
+    return [[tc.xpath("string(.)") + "|" + str(len(tc.xpath(".//w:tab | .//w:br"))) for tc in tr.tc_lst]
+            for tr in tbl.tr_lst]
+
+def run_child(csv_path, rows, fast_table, out_path):
+    """子进程入口：生成并保存一个分卷，最后一行输出 JSON (耗时、峰值 RSS、文件大小)"""
+    tool = load_tool("csv_to_word_gui.py")
+    df = pd.read_csv(csv_path, nrows=rows)
+    values = tool.materialize_rows(df)
+    start = time.perf_counter()
+    doc = tool.CSVtoWordApp.build_document(df.columns.tolist(), values, fast_table)
+    build_sec = time.perf_counter() - start
+    start = time.perf_counter()
+    doc.save(out_path)
+    save_sec = time.perf_counter() - start
+    print(json.dumps(dict(rows=len(values), build_sec=build_sec, save_sec=save_sec, peak_rss_mb=peak_rss_mb(),
+                          size_kb=os.path.getsize(out_path) / 1024)))
+
+def measure(csv_path, rows, fast_table, out_path):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", csv_path, str(rows),
+                           "1" if fast_table else "0", out_path], capture_output=True, text=True)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        sys.stderr.write(proc.stderr)
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        return run_child(sys.argv[2], int(sys.argv[3]), sys.argv[4] == "1", sys.argv[5])
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="两种模式对比的行数")
+    parser.add_argument("--fast-rows", type=int, default=5000, help="快速写表单独计时的行数 (完整分卷，0 表示跳过)")
+    parser.add_argument("--columns", type=int, default=10, help="合成 CSV 的列数")
+    parser.add_argument("--csv", help="使用现有 CSV 代替合成语料")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv or make_segment_csv(os.path.join(tmp, "segments.csv"), max(args.rows, args.fast_rows),
+                                                args.columns)
+        runs = [("逐格写入", args.rows, False), ("快速写表", args.rows, True)]
+        if args.fast_rows:
+            runs.append(("快速写表", args.fast_rows, True))
+
+        print(f"{'模式':<10}{'行数':>8}{'建表(s)':>10}{'保存(s)':>10}{'每千行(s)':>12}{'峰值RSS(MB)':>14}{'大小(KB)':>10}")
+        outputs = []
+        for k, (name, rows, fast_table) in enumerate(runs):
+            out_path = os.path.join(tmp, f"part{k}.docx")
+            result = measure(csv_path, rows, fast_table, out_path)
+            if result is None:
+                print(f"{name:<10}{rows:>8}  失败")
+                sys.exit(1)
+            outputs.append(out_path)
+            total = result["build_sec"] + result["save_sec"]
+            print(f"{name:<10}{result['rows']:>8}{result['build_sec']:>10.2f}{result['save_sec']:>10.2f}"
+                  f"{total * 1000 / max(result['rows'], 1):>12.3f}{result['peak_rss_mb']:>14.1f}{result['size_kb']:>10.1f}")
+
+        if cell_texts(outputs[0]) != cell_texts(outputs[1]):
+            print("❌ 两种模式的单元格内容不一致")
+            sys.exit(1)
+        print("一致性校验通过")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+内存受限模式校验：用合成的超长 PDF (默认 10,000 页) 跑完整提取流程，断言各工具进程的峰值常驻内存不超过上限
+
+每个工具在独立子进程中以无界面模式运行 (--memory-budget-mb)，子进程结束时回报自身峰值 RSS；
+任一工具失败或超出 --rss-limit-mb 时以非零退出码结束，可直接用作回归检查。
+用法: python benchmarks/bench_memory_bounded.py [--pages 10000] [--budget-mb 160] [--rss-limit-mb 256] [--pdf 现有.pdf]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+from _common import load_tool, make_mixed_pdf, peak_rss_mb
+
+TOOLS = ("I-LOVE-PDF.py", "clean-pdf.py", "Ultimate_PDF_Extractor-pro.py")
+
+def run_child(tool_name, argv):
+    """子进程入口：运行工具命令行后在最后一行输出峰值 RSS"""
+    tool = load_tool(tool_name)
+    code = tool.main(argv)
+    print(f"{code} {peak_rss_mb():.1f}")
+
+def measure(tool_name, pdf_path, out_dir, budget_mb, extra):
+    # 不读写提取缓存：既不往用户目录写入上万页缓存，重复运行也不会因命中缓存而失真
+    argv = [pdf_path, "-o", out_dir, "--quiet", "--no-cache", "--memory-budget-mb", str(budget_mb)] + extra
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", tool_name, "--"] + argv,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0 or not proc.stdout.strip():
+        sys.stderr.write(proc.stderr)
+        return None, None, elapsed
+    code, rss = proc.stdout.strip().splitlines()[-1].split()
+    return int(code), float(rss), elapsed
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        return run_child(sys.argv[2], sys.argv[4:])
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10000, help="合成 PDF 的页数")
+    parser.add_argument("--scan-ratio", type=float, default=0.0, help="扫描页比例 (需要 Tesseract)")
+    parser.add_argument("--budget-mb", type=int, default=160, help="传给工具的 --memory-budget-mb")
+    parser.add_argument("--rss-limit-mb", type=float, default=256, help="判定通过的峰值 RSS 上限")
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), help="参与校验的工具脚本")
+    parser.add_argument("--pdf", help="使用现有 PDF 代替合成语料")
+    parser.add_argument("extra", nargs="*", help="额外传给工具的参数 (放在 -- 之后)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            pdf_path = args.pdf
+        else:
+            start = time.perf_counter()
+            pdf_path = make_mixed_pdf(os.path.join(tmp, "large.pdf"), args.pages, args.scan_ratio)
+            print(f"合成语料: {args.pages} 页，用时 {time.perf_counter() - start:.1f}s")
+
+        print(f"{'工具':<32}{'退出码':>6}{'峰值RSS(MB)':>14}{'用时(s)':>10}")
+        failed = False
+        for tool_name in args.tools:
+            out_dir = os.path.join(tmp, os.path.splitext(tool_name)[0])
+            code, rss, elapsed = measure(tool_name, pdf_path, out_dir, args.budget_mb, args.extra)
+            ok = code == 0 and rss is not None and rss <= args.rss_limit_mb
+            failed |= not ok
+            rss_text = f"{rss:.1f}" if rss is not None else "-"
+            print(f"{tool_name:<32}{str(code):>6}{rss_text:>14}{elapsed:>10.1f}  {'OK' if ok else 'FAIL'}")
+
+    print(f"上限 {args.rss_limit_mb:.0f} MB: {'全部通过' if not failed else '存在超限或失败'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
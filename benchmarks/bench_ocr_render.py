@@ -0,0 +1,95 @@
+"""
+OCR 渲染路径基准：PNG 编码/解码往返 vs 直接包装 pixmap 像素缓冲 (RGB / 灰度)
+
+每种方案在独立子进程中运行；逐页在内存占用最高处 (PNG 字节与解码图像同时存在时、图像载入后) 采样当前 RSS，
+报告相对渲染循环开始前的逐页最大增量与平均增量 (进程级峰值 RSS 早在载入模块时就已达到，不能反映单页差异)。
+子进程固定 glibc 的 mmap 阈值，大块缓冲释放后立即归还系统，RSS 才能反映当前存活的位图。
+用法: python benchmarks/bench_ocr_render.py [--pages 100] [--pdf 扫描件.pdf] [--with-ocr]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from _common import load_tool, make_scanned_pdf
+
+current_rss_mb = load_tool("pdf_core.py").current_rss_mb  # 与内存预算检查共用同一实现
+
+VARIANTS = ["png", "buffer-rgb", "buffer-gray"]
+# glibc 默认的动态 mmap 阈值会把释放过的大块缓冲留在堆中，RSS 只增不减；固定阈值后 >128KB 的分配释放即归还
+CHILD_ENV = dict(os.environ, MALLOC_MMAP_THRESHOLD_="131072")
+
+def render_png_roundtrip(page, sample):
+    """旧路径：pixmap -> PNG 字节 -> 再解码为 PIL 图像 (在 pixmap、PNG 字节与解码图像都存在时采样)"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
+    img = Image.open(io.BytesIO(pix.tobytes("png")))
+    img.load()
+    sample()
+    return img
+
+def run_variant(variant, pdf_path, with_ocr):
+    tool = load_tool("I-LOVE-PDF.py")
+    page_peak = [0.0]
+    def sample():
+        page_peak[0] = max(page_peak[0], current_rss_mb() - baseline_mb)
+
+    if variant == "png":
+        render = lambda page: render_png_roundtrip(page, sample)
+    else:
+        grayscale = variant == "buffer-gray"
+        render = lambda page: tool.render_ocr_image(page, grayscale)
+
+    doc = fitz.open(pdf_path)
+    baseline_mb = current_rss_mb()
+    page_peaks = []
+    start = time.perf_counter()
+    for page in doc:
+        page_peak[0] = 0.0
+        img = render(page)
+        img.load()
+        sample()
+        page_peaks.append(page_peak[0])
+        if with_ocr:
+            tool.get_pytesseract().image_to_string(img, lang="eng")
+        del img
+        fitz.TOOLS.store_shrink(100)  # 清空 MuPDF 资源缓存，只比较渲染/转换路径本身的内存
+    elapsed = time.perf_counter() - start
+    pages = len(doc)
+    doc.close()
+    return {"variant": variant, "pages": pages, "ms_per_page": elapsed * 1000 / pages,
+            "page_peak_mb": max(page_peaks), "page_mean_mb": sum(page_peaks) / pages}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100, help="合成扫描件的页数")
+    parser.add_argument("--pdf", help="使用现有扫描件代替合成 PDF")
+    parser.add_argument("--with-ocr", action="store_true", help="计时包含 tesseract 识别")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if current_rss_mb() is None:
+        sys.exit("需要 psutil 或 /proc 才能采样当前 RSS")
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.pdf, args.with_ocr)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf or make_scanned_pdf(os.path.join(tmp, "scanned.pdf"), args.pages)
+        print(f"{'方案':<14}{'页数':>6}{'ms/页':>10}{'单页最大增量RSS(MB)':>20}{'单页平均增量(MB)':>18}")
+        for variant in VARIANTS:
+            cmd = [sys.executable, os.path.abspath(__file__), "--variant", variant, "--pdf", pdf_path]
+            if args.with_ocr:
+                cmd.append("--with-ocr")
+            result = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True, env=CHILD_ENV).stdout.strip().splitlines()[-1])
+            print(f"{variant:<14}{result['pages']:>6}{result['ms_per_page']:>10.1f}{result['page_peak_mb']:>20.1f}"
+                  f"{result['page_mean_mb']:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+阅读顺序基准：(y, x) 排序 vs XY-cut 分栏排序
+
+语料为合成的双栏论文版式 PDF (部分页带通栏标题)。先校验 XY-cut 在每页都把左栏正文排在右栏之前，
+再只对排序本身计时 (文本块预先取出)，并与逐页文本提取耗时对比，给出排序占单页处理的比例。
+用法: python benchmarks/bench_reading_order.py [--pages 300] [--tool I-LOVE-PDF.py] [--pdf 现有.pdf]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import fitz  # PyMuPDF
+
+from _common import load_tool, make_two_column_pdf
+
+COLUMN_SPLIT_X = 300  # 合成语料的栏间空白位置
+
+def sort_yx(blocks):
+    return sorted(blocks, key=lambda b: (b[1], b[0]))
+
+def column_order_ok(ordered):
+    """正文块 (不含页眉、页码与通栏标题) 中左栏必须全部排在右栏之前"""
+    body = [b for b in ordered if b[3] - b[1] > 40 and b[2] - b[0] < 260]
+    sides = [b[0] >= COLUMN_SPLIT_X for b in body]
+    return sides == sorted(sides)
+
+def time_order(order, pages_blocks, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for blocks in pages_blocks:
+            order(blocks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="合成 PDF 的页数")
+    parser.add_argument("--rounds", type=int, default=5, help="重复次数 (取最快一轮)")
+    parser.add_argument("--tool", default="I-LOVE-PDF.py", help="取 reading_order 实现的工具脚本")
+    parser.add_argument("--pdf", help="使用现有 PDF 代替合成语料 (跳过栏序校验)")
+    args = parser.parse_args()
+    reading_order = load_tool(args.tool).reading_order
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf or make_two_column_pdf(os.path.join(tmp, "twocol.pdf"), args.pages)
+        with fitz.open(pdf_path) as doc:
+            start = time.perf_counter()
+            pages_blocks = [[b for b in page.get_text("blocks") if b[6] == 0] for page in doc]
+            extract = time.perf_counter() - start
+    pages = len(pages_blocks)
+
+    if not args.pdf:
+        interleaved = sum(not column_order_ok(sort_yx(blocks)) for blocks in pages_blocks)
+        wrong = [k + 1 for k, blocks in enumerate(pages_blocks) if not column_order_ok(reading_order(blocks))]
+        assert not wrong, f"XY-cut 栏序错误的页: {wrong[:10]}"
+        print(f"栏序校验通过: {pages} 页 ((y, x) 排序有 {interleaved} 页左右栏交错)")
+
+    print(f"{'方案':<10}{'页数':>6}{'ms/页':>10}{'占提取耗时':>12}")
+    for name, order in (("sort_yx", sort_yx), ("xy_cut", reading_order)):
+        elapsed = time_order(order, pages_blocks, args.rounds)
+        print(f"{name:<10}{pages:>6}{elapsed * 1000 / pages:>10.3f}{elapsed / extract * 100:>11.1f}%")
+    print(f"参照: 文本块提取 {extract * 1000 / pages:.3f} ms/页")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+文本清洗引擎基准：逐条 re 调用的旧实现 vs 预编译规则表 + 合并替换的新实现
+
+语料按模板随机合成 (正文段落、连字符断词、文内引用、日期/页码/水印等噪声块)，
+两种实现先在整个模板池上逐条比对结果一致，再分别对 ~1M 个块计时，输出 blocks/sec。
+用法: python benchmarks/bench_text_cleaner.py [--blocks 1000000] [--pool 20000]
+"""
+import re
+import time
+import random
+import argparse
+import itertools
+
+from _common import load_tool, random_paragraph, WORDS
+
+class LegacyTextCleaner:
+    """重构前的 UltimateTextCleaner (每次调用按字符串模式走 re 模块缓存，heal_text 四次遍历)"""
+    @staticmethod
+    def inspect_block(text, y0, y1, page_height, safe_mode):
+        text = text.strip()
+        if not text:
+            return True, "空白符"
+        if re.search(r'Downloaded from http', text, re.IGNORECASE):
+            return True, "学术下载水印"
+        if re.fullmatch(r'^(?:[0-3]?\d\s+)?[A-Z][a-z]{2,8}\s+\d{4}$', text):
+            return True, "孤立日期"
+        if re.match(r'^([xvi]+|\d+)\s*$', text, re.IGNORECASE):
+            return True, "孤立页码"
+        if text.isupper() and len(text) > 5:
+            return False, ""
+        is_top = y0 < (page_height * 0.08)
+        is_bottom = y1 > (page_height * 0.92)
+        word_count = len(text.split())
+        if (is_top or is_bottom) and word_count < 10:
+            return True, "边缘页眉/页脚"
+        if not safe_mode:
+            if word_count < 6 and not text[-1] in ".?!\"'":
+                words = text.split()
+                title_case_words = sum(1 for w in words if w.istitle())
+                if words and (title_case_words / len(words) > 0.6):
+                    return True, "无标点首字母大写(疑似署名)"
+        return False, ""
+
+    @staticmethod
+    def heal_text(text):
+        if text.isupper():
+            text = text.replace('\n', ' ')
+        else:
+            text = re.sub(r'([a-zA-Z]+)[-\xad]\s*\n\s*([a-zA-Z]+)', r'\1\2', text)
+            text = text.replace('\n', ' ')
+        text = re.sub(r'([a-zA-Z]{2,}[\.\,\?!\'"]+)(\d{1,3})(?=\s|$)', r'\1 [\2]', text)
+        return re.sub(r'\s{2,}', ' ', text).strip()
+
+def wrap_lines(rng, text):
+    """模拟 PDF 文本块的行内换行，部分断行处带连字符"""
+    words, out = text.split(" "), []
+    for w in words:
+        out.append(w)
+        roll = rng.random()
+        if roll < 0.08 and len(w) > 4:
+            cut = rng.randint(2, len(w) - 2)
+            out[-1] = w[:cut] + rng.choice("-\xad") + "\n" + w[cut:]
+        elif roll < 0.2:
+            out[-1] += "\n"
+    return " ".join(out).replace("\n ", "\n")
+
+def make_block(rng):
+    """按比例合成一个文本块：(文本, y0, y1, 页高)"""
+    kind = rng.random()
+    y0 = rng.uniform(0, 800)
+    if kind < 0.6:
+        text = wrap_lines(rng, random_paragraph(rng, rng.randint(8, 80)))
+        if rng.random() < 0.3:
+            text = text.replace(".", f".{rng.randint(1, 120)}", 1)
+    elif kind < 0.7:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))).upper()
+    elif kind < 0.78:
+        text = " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 5)))
+    elif kind < 0.85:
+        text = rng.choice([str(rng.randint(1, 400)), "xii", "IV ", f"{rng.randint(1, 28)} March 2021", "June 1999"])
+    elif kind < 0.9:
+        text = f"Downloaded from http://journals.example.org/{rng.randint(1, 9999)} by guest"
+    else:
+        text = rng.choice(["  ", "\n", f"Figure {rng.randint(1, 9)}.{rng.randint(1, 20)} shows\n  the  data.", "Tom,12 and Ann!3"])
+    return text, y0, y0 + rng.uniform(8, 60), 842.0
+
+def run(cleaner, corpus):
+    start = time.perf_counter()
+    for text, y0, y1, page_height in corpus:
+        is_noise, _ = cleaner.inspect_block(text, y0, y1, page_height, False)
+        if not is_noise:
+            cleaner.heal_text(text)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=1_000_000, help="计时的块数")
+    parser.add_argument("--pool", type=int, default=20_000, help="去重模板池大小 (语料循环取用)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [make_block(rng) for _ in range(args.pool)]
+    current = load_tool("I-LOVE-PDF.py").UltimateTextCleaner
+
+    for text, y0, y1, page_height in pool:
+        for safe_mode in (True, False):
+            expected = LegacyTextCleaner.inspect_block(text, y0, y1, page_height, safe_mode)
+            assert current.inspect_block(text, y0, y1, page_height, safe_mode) == expected, repr(text)
+        assert current.heal_text(text) == LegacyTextCleaner.heal_text(text), repr(text)
+    print(f"一致性校验通过: {len(pool)} 个模板块")
+
+    corpus = list(itertools.islice(itertools.cycle(pool), args.blocks))
+    print(f"{'实现':<10}{'块数':>10}{'耗时(s)':>10}{'blocks/sec':>14}")
+    for name, cleaner in (("legacy", LegacyTextCleaner), ("compiled", current)):
+        elapsed = run(cleaner, corpus)
+        print(f"{name:<10}{len(corpus):>10}{elapsed:>10.2f}{len(corpus) / elapsed:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+单页文本提取基准：get_text() + get_text("blocks") 两次解释内容流 vs 共用同一个 TextPage
+
+语料为文本页与扫描页混排的合成 PDF；两种方案先逐页比对判定长度与文本块一致，再分别计时。
+用法: python benchmarks/bench_text_extraction.py [--pages 500] [--scan-ratio 0.2] [--pdf 现有.pdf]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import fitz  # PyMuPDF
+
+from _common import make_mixed_pdf
+
+def extract_twice(page):
+    """旧路径：纯文本判定扫描件，再单独取文本块"""
+    return len(page.get_text().strip()), page.get_text("blocks")
+
+def extract_once(page):
+    """新路径：构建一次 TextPage，判定与分块都从它读取"""
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_BLOCKS)
+    return len(page.get_text(textpage=textpage).strip()), page.get_text("blocks", textpage=textpage)
+
+def run(extract, pdf_path, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        doc = fitz.open(pdf_path)
+        start = time.perf_counter()
+        for page in doc:
+            extract(page)
+        best = min(best, time.perf_counter() - start)
+        doc.close()
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="合成 PDF 的页数")
+    parser.add_argument("--scan-ratio", type=float, default=0.2, help="扫描页比例")
+    parser.add_argument("--rounds", type=int, default=3, help="重复次数 (取最快一轮)")
+    parser.add_argument("--pdf", help="使用现有 PDF 代替合成语料")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf or make_mixed_pdf(os.path.join(tmp, "mixed.pdf"), args.pages, args.scan_ratio)
+        with fitz.open(pdf_path) as doc:
+            pages = len(doc)
+            for page in doc:
+                assert extract_twice(page) == extract_once(page), f"第 {page.number + 1} 页结果不一致"
+        print(f"一致性校验通过: {pages} 页")
+
+        print(f"{'方案':<10}{'页数':>6}{'ms/页':>10}")
+        results = {}
+        for name, extract in (("twice", extract_twice), ("textpage", extract_once)):
+            results[name] = run(extract, pdf_path, args.rounds)
+            print(f"{name:<10}{pages:>6}{results[name] * 1000 / pages:>10.3f}")
+        print(f"节省: {(1 - results['textpage'] / results['twice']) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
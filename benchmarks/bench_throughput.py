@@ -0,0 +1,162 @@
+"""
+吞吐基准：用固定种子合成的语料 (单栏 / 双栏 / 扫描 / 混排 / 超长) 逐个驱动三个工具的 PDFProcessorWorker，
+记录页/秒、峰值 RSS 与各阶段耗时 (取自 Worker 的 --profile 性能报告)，结果追加到历史文件并与上一次同设置的运行比较
+
+每个 (工具, 语料) 在独立子进程中运行，峰值 RSS 互不干扰；不使用提取缓存与断点续跑，每轮都从头解析。
+页/秒下降或峰值 RSS 上升超过 --tolerance 记为回退，加 --fail-on-regression 时以非零退出码结束。
+用法: python benchmarks/bench_throughput.py [--corpus text mixed] [--scale 0.5] [--rounds 3] [--page-workers 4]
+"""
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+import fitz  # PyMuPDF
+
+from _common import CORPUS, ROOT_DIR, build_corpus, load_tool, peak_rss_mb
+
+TOOLS = ("I-LOVE-PDF.py", "clean-pdf.py", "Ultimate_PDF_Extractor-pro.py")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "throughput.jsonl")
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "pdf-bench-corpus")
+TOP_STAGES = 3  # 表格中列出的最耗时阶段数
+
+def run_child(tool_name, pdf_path, out_dir, report_path, options):
+    """子进程入口：构造工具的 PDFProcessorWorker 处理单个文件，最后一行输出 JSON (状态、用时、峰值 RSS)"""
+    tool = load_tool(tool_name)
+    kw = dict(pdf_paths=[pdf_path], output_dir=out_dir, scan_threshold=50, ocr_lang=options["ocr_lang"],
+              gui_callback=lambda v: None, log_callback=lambda msg: None, finish_callback=lambda: None,
+              page_workers=options["page_workers"], ocr_workers=options["ocr_workers"],
+              profile_path=report_path, cache_dir=None, resume=False)
+    if "safe_mode" in inspect.signature(tool.PDFProcessorWorker.__init__).parameters:
+        kw["safe_mode"] = True  # clean-pdf / pro 的构造参数不区分安全模式
+    worker = tool.PDFProcessorWorker(**kw)
+    start = time.perf_counter()
+    worker.run()
+    elapsed = time.perf_counter() - start
+    status = worker.results[0]["status"] if worker.results else "cancelled"
+    print(json.dumps(dict(status=status, elapsed_sec=elapsed, peak_rss_mb=peak_rss_mb())))
+
+def measure(tool_name, pdf_path, pages, options, tmp):
+    """在子进程中跑一轮，返回记录 (页/秒、峰值 RSS、各阶段累计耗时)；失败时返回 None"""
+    out_dir = os.path.join(tmp, os.path.splitext(tool_name)[0])
+    os.makedirs(out_dir, exist_ok=True)
+    report_path = os.path.join(out_dir, "profile.json")
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", tool_name, pdf_path, out_dir, report_path,
+                           json.dumps(options)], capture_output=True, text=True)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        sys.stderr.write(proc.stderr)
+        return None
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    if child["status"] != "ok":
+        return None
+    with open(report_path, encoding='utf-8') as f:
+        totals = json.load(f)["totals"]
+    return dict(elapsed_sec=round(child["elapsed_sec"], 4), pages_per_sec=round(pages / child["elapsed_sec"], 2),
+                peak_rss_mb=round(child["peak_rss_mb"], 1), stages=totals["stages"], counts=totals["counts"])
+
+def git_revision():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+def load_previous_run(history_path, settings):
+    """历史文件中最近一次设置相同的运行；没有时返回 None"""
+    previous = None
+    try:
+        with open(history_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if run.get("settings") == settings:
+                    previous = run
+    except OSError:
+        pass
+    return previous
+
+def compare(record, baseline, tolerance):
+    """与上次同设置的记录比较，返回 (对比文本, 是否回退)"""
+    if baseline is None:
+        return "新基线", False
+    speed = record["pages_per_sec"] / baseline["pages_per_sec"] - 1
+    rss = record["peak_rss_mb"] / baseline["peak_rss_mb"] - 1
+    regressed = speed < -tolerance or rss > tolerance
+    return f"{speed:+.1%} 速度 / {rss:+.1%} RSS", regressed
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        return run_child(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5], json.loads(sys.argv[6]))
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", nargs="+", choices=list(CORPUS), default=list(CORPUS), help="参与计时的语料")
+    parser.add_argument("--scale", type=float, default=1.0, help="语料页数缩放比例 (默认页数见 _common.CORPUS)")
+    parser.add_argument("--seed", type=int, default=0, help="语料生成种子")
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), help="参与计时的工具脚本")
+    parser.add_argument("--rounds", type=int, default=1, help="每组重复次数 (取最快一轮)")
+    parser.add_argument("--page-workers", type=int, default=1, help="页面并行进程数")
+    parser.add_argument("--ocr-workers", type=int, help="OCR 线程数 (默认: CPU 核数)")
+    parser.add_argument("--lang", default="eng", help="OCR 识别语言")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help=f"语料缓存目录 (默认: {DEFAULT_CORPUS_DIR})")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="结果历史文件 (JSONL，每次运行追加一行)")
+    parser.add_argument("--no-save", action="store_true", help="只与历史比较，不追加本次结果")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="判定回退的相对变化阈值 (默认: 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="出现回退时以退出码 1 结束")
+    args = parser.parse_args()
+
+    tesseract_available = load_tool("pdf_core.py").TESSERACT_AVAILABLE
+    start = time.perf_counter()
+    corpus = build_corpus(args.corpus_dir, args.corpus, args.scale, args.seed)
+    print(f"语料: {', '.join(f'{name} {pages} 页' for name, _, pages, _ in corpus)}，准备用时 {time.perf_counter() - start:.1f}s")
+
+    options = dict(page_workers=args.page_workers, ocr_workers=args.ocr_workers, ocr_lang=args.lang)
+    settings = dict(options, scale=args.scale, seed=args.seed, rounds=args.rounds)
+    previous = load_previous_run(args.history, settings)
+    baselines = {(r["tool"], r["corpus"]): r for r in previous["results"]} if previous else {}
+    if previous:
+        print(f"对比基线: {previous['created']} (提交 {previous.get('commit') or '-'})")
+
+    print(f"{'工具':<32}{'语料':<12}{'页数':>6}{'页/秒':>10}{'峰值RSS(MB)':>14}  {'较上次':<26}主要阶段 (s)")
+    results, regressions = [], 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, pdf_path, pages, needs_ocr in corpus:
+            if needs_ocr and not tesseract_available:
+                print(f"{'-':<32}{name:<12}{pages:>6}  跳过 (未检测到 Tesseract)")
+                continue
+            for tool_name in args.tools:
+                rounds = [measure(tool_name, pdf_path, pages, options, tmp) for _ in range(args.rounds)]
+                rounds = [r for r in rounds if r is not None]
+                if not rounds:
+                    regressions += 1
+                    print(f"{tool_name:<32}{name:<12}{pages:>6}  失败")
+                    continue
+                record = dict(tool=tool_name, corpus=name, pages=pages, **max(rounds, key=lambda r: r["pages_per_sec"]))
+                delta, regressed = compare(record, baselines.get((tool_name, name)), args.tolerance)
+                regressions += regressed
+                results.append(record)
+                top = ", ".join(f"{stage} {sec:.2f}" for stage, sec in list(record["stages"].items())[:TOP_STAGES])
+                print(f"{tool_name:<32}{name:<12}{pages:>6}{record['pages_per_sec']:>10.1f}{record['peak_rss_mb']:>14.1f}  "
+                      f"{delta:<26}{top}{'  ⚠️ 回退' if regressed else ''}")
+
+    if not args.no_save:
+        run = dict(created=datetime.now().isoformat(timespec="seconds"), commit=git_revision(), settings=settings,
+                   machine=dict(python=platform.python_version(), platform=platform.platform(), cpus=os.cpu_count(),
+                                pymupdf=fitz.VersionBind, tesseract=tesseract_available),
+                   results=results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+        print(f"结果已追加到: {args.history}")
+    print(f"回退: {regressions} 项 (阈值 {args.tolerance:.0%})" if regressions else "无回退")
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+if __name__ == "__main__":
+    main()
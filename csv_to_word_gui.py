@@ -1,20 +1,165 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import numpy as np
 import pandas as pd
 from docx import Document
 from docx.shared import Pt
-from docx.oxml.ns import qn
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn, nsdecls
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.table import WD_TABLE_ALIGNMENT
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
 import threading
-import math
 import os
 
+def materialize_rows(chunk_df):
+    """把一个分块一次性转换为字符串二维列表：空值 (NaN) 先映射为空串，再逐列向量化转为 str，
+    建表时只遍历普通 Python 列表，不再逐行 iterrows() / 逐格 pd.isna()"""
+    # 与原先 iterrows() 的行数据保持一致：全部为数值列时整行按公共类型提升 (如整数列与浮点列并存时 1 显示为 1.0)
+    dtypes = chunk_df.dtypes.tolist()
+    if dtypes and all(isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in dtypes):
+        chunk_df = chunk_df.astype(np.result_type(*dtypes))
+    return chunk_df.fillna("").astype(str).to_numpy().tolist()
+
+# 为了防止 Word 崩溃，按单元格数与文字量切割分卷，任一达到上限即开始下一个文件
+PART_CELL_BUDGET = 50000  # 每个分卷的单元格数上限 (相当于原先 10 列 × 5000 行)
+PART_TEXT_BUDGET = 2000000  # 每个分卷的文字量上限 (字符数)，长译文较多时提前切分
+READ_CHUNK_ROWS = 1000  # 流式读取每块的行数，只影响读取粒度
+SCAN_CHUNK_ROWS = 50000  # 预扫描每次读取的行数，只影响扫描速度与瞬时内存
+UI_POLL_MS = 100  # 界面线程刷新进度与状态的间隔
+
+def merge_dtypes(dtypes):
+    """把各分块推断出的列类型合并为整列类型：类型一致时保持不变，纯数值按 numpy 规则提升 (如整数 + 含空值 -> 浮点)，其余按文本读取"""
+    dtypes = set(dtypes)
+    if len(dtypes) == 1:
+        return dtypes.pop()
+    if all(isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in dtypes):
+        return np.result_type(*dtypes)
+    return object
+
+def scan_csv(csv_path):
+    """流式预扫描：统计数据行数，并按整个文件确定各列类型，
+    逐块读取时各分卷的数值格式与一次性 read_csv 相同 (如含空值的整数列在所有分卷中都显示为 3.0)"""
+    total_rows, column_dtypes = 0, {}
+    for chunk_df in pd.read_csv(csv_path, chunksize=SCAN_CHUNK_ROWS):
+        total_rows += len(chunk_df)
+        for name, dtype in chunk_df.dtypes.items():
+            column_dtypes.setdefault(name, []).append(dtype)
+    return total_rows, {name: merge_dtypes(dtypes) for name, dtypes in column_dtypes.items()}
+
+# 快速写表模式下所有单元格文字共用的字符样式 (字号 + 中英文字体)，取代逐个 run 的直接格式
+TABLE_RUN_STYLE = "CSV Table Text"
+
+def add_table_run_style(doc):
+    """在文档中登记表格文字的字符样式，返回其 styleId"""
+    style = doc.styles.add_style(TABLE_RUN_STYLE, WD_STYLE_TYPE.CHARACTER)
+    style.font.size = Pt(11)
+    style.font.name = 'Times New Roman'
+    style.element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+    return style.style_id
+
+def run_xml(text, style_id):
+    """单元格文字对应的 <w:r> 片段；与 python-docx 的 run.text 一致，制表符写为 <w:tab/>，换行写为 <w:br/>"""
+    if not text:
+        return ""
+    parts = []
+    for k, line in enumerate(text.replace("\r", "\n").split("\n")):
+        if k:
+            parts.append('<w:br/>')
+        for j, piece in enumerate(line.split("\t")):
+            if j:
+                parts.append('<w:tab/>')
+            if piece:
+                space = ' xml:space="preserve"' if piece.strip() != piece else ''
+                parts.append(f'<w:t{space}>{escape(piece)}</w:t>')
+    return f'<w:r><w:rPr><w:rStyle w:val="{style_id}"/></w:rPr>{"".join(parts)}</w:r>'
+
+def build_part(columns, rows, fast_table, output_filename):
+    """生成并保存一个分卷文档 (进程池任务入口，须为模块级函数)"""
+    CSVtoWordApp.build_document(columns, rows, fast_table).save(output_filename)
+    return output_filename
+
+def iter_parts(csv_path, dtypes, cell_budget=PART_CELL_BUDGET, text_budget=PART_TEXT_BUDGET):
+    """按预算切分分卷：逐块读取时累计每行的单元格数与文字量，任一将超出上限就切出当前分卷；产出 (表头, 行数据)。
+    单行的文字量超出预算时独占一个分卷"""
+    reader = pd.read_csv(csv_path, chunksize=READ_CHUNK_ROWS, dtype=dtypes)
+    try:
+        part_rows, part_chars = [], 0
+        for chunk_df in reader:
+            columns = chunk_df.columns.tolist()
+            max_rows = max(1, cell_budget // max(1, len(columns)))
+            for row in materialize_rows(chunk_df):
+                row_chars = sum(map(len, row))
+                if part_rows and (len(part_rows) >= max_rows or part_chars + row_chars > text_budget):
+                    yield columns, part_rows
+                    part_rows, part_chars = [], 0
+                part_rows.append(row)
+                part_chars += row_chars
+        if part_rows:
+            yield columns, part_rows
+    finally:
+        reader.close()
+
+def convert_csv(csv_path, fast_table=True, part_workers=1, progress_callback=None):
+    """流式转换：逐块读取 CSV，按 iter_parts 的预算切出分卷，生成文档后即释放，峰值内存与 CSV 大小无关；返回分卷数。
+    progress_callback(status, fraction) 接收状态文字与进度 (0~1，按已完成的行数计算)"""
+    report = progress_callback or (lambda status, fraction=None: None)
+    report("正在扫描 CSV 数据，请稍候...")
+    total_rows, dtypes = scan_csv(csv_path)
+
+    output_dir = os.path.dirname(csv_path)
+    base_name = os.path.splitext(os.path.basename(csv_path))[0]
+    report("正在生成文档...", 0)
+
+    # 多进程时分卷在进程池中并行生成；分卷编号在切块时确定，与完成先后无关
+    pool = ProcessPoolExecutor(max_workers=part_workers) if part_workers > 1 else None
+    in_flight = {}  # 在途分卷 -> 行数
+    done_parts = done_rows = 0
+
+    def collect(limit):
+        """等待在途分卷直到不超过 limit 个，子进程中的异常在此抛出"""
+        nonlocal done_parts, done_rows
+        while len(in_flight) > limit:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done_rows += in_flight.pop(future)
+            done_parts += len(finished)
+            report(f"已完成 {done_parts} 个文档，{done_rows}/{total_rows} 行 ({part_workers} 进程并行)...", done_rows / total_rows)
+
+    try:
+        for i, (columns, rows) in enumerate(iter_parts(csv_path, dtypes)):
+            output_filename = os.path.join(output_dir, f"{base_name}_排版输出_Part{i+1}.docx")
+
+            if pool is None:
+                report(f"正在生成第 {i+1} 个文档 (第 {done_rows + 1}-{done_rows + len(rows)}/{total_rows} 行)...", done_rows / total_rows)
+                build_part(columns, rows, fast_table, output_filename)
+                done_parts += 1
+                done_rows += len(rows)
+                continue
+
+            in_flight[pool.submit(build_part, columns, rows, fast_table, output_filename)] = len(rows)
+            # 在途分卷最多为进程数的两倍，已读入但未生成的行数据不会无限堆积
+            collect(part_workers * 2 - 1)
+        collect(0)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    report("转换彻底完成！请查看 CSV 所在文件夹。", 1.0)
+    return done_parts
+
 class CSVtoWordApp:
     def __init__(self, root):
         self.root = root
         self.root.title("终极 CSV 转 Word 表格排版神器")
-        self.root.geometry("500x300")
+        self.root.geometry("500x330")
         self.root.resizable(False, False)
+        self.pending_progress = None
+        self.worker_thread = None
+        self.run_error = None
 
         # UI 元素布局
         self.setup_ui()
@@ -35,13 +180,23 @@ class CSVtoWordApp:
         btn_browse = tk.Button(file_frame, text="浏览 CSV", command=self.browse_file)
         btn_browse.pack(side=tk.LEFT)
 
+        # 写表模式与并行进程数
+        options_frame = tk.Frame(self.root)
+        options_frame.pack()
+        self.fast_table_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(options_frame, text="快速写表 (批量生成 XML)", variable=self.fast_table_var).pack(side=tk.LEFT, padx=10)
+        tk.Label(options_frame, text="并行进程数:").pack(side=tk.LEFT)
+        self.part_workers_var = tk.IntVar(value=1)
+        tk.Spinbox(options_frame, from_=1, to=os.cpu_count() or 1, width=4, textvariable=self.part_workers_var,
+                   state="readonly").pack(side=tk.LEFT)
+
         # 进度显示
         self.status_var = tk.StringVar()
         self.status_var.set("准备就绪")
         status_label = tk.Label(self.root, textvariable=self.status_var, fg="blue")
         status_label.pack(pady=10)
 
-        self.progress = ttk.Progressbar(self.root, orient="horizontal", length=400, mode="determinate")
+        self.progress = ttk.Progressbar(self.root, orient="horizontal", length=400, mode="determinate", maximum=1.0)
         self.progress.pack(pady=10)
 
         # 执行按钮
@@ -54,7 +209,8 @@ class CSVtoWordApp:
             self.csv_path = filepath
             self.path_label.config(text=os.path.basename(filepath), fg="black")
 
-    def set_cell_font(self, cell, text):
+    @staticmethod
+    def set_cell_font(cell, text):
         """核心逻辑：设置单元格文本，并完美分离中英文字体"""
         # 清空单元格默认的段落
         cell.text = ""
@@ -70,83 +226,103 @@ class CSVtoWordApp:
         # 2. 设置东亚字体 (Chinese) - 需要操作底层 XML
         run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
 
-    def process_data(self):
-        try:
-            self.btn_run.config(state=tk.DISABLED)
-            self.status_var.set("正在读取 CSV 数据，请稍候...")
-            
-            # 读取 CSV
-            df = pd.read_csv(self.csv_path)
-            total_rows = len(df)
-            columns = df.columns.tolist()
-            col_count = len(columns)
-
-            # 为了防止 Word 崩溃，每 5000 行切割为一个文件
-            chunk_size = 5000
-            total_chunks = math.ceil(total_rows / chunk_size)
-            
-            output_dir = os.path.dirname(self.csv_path)
-            base_name = os.path.splitext(os.path.basename(self.csv_path))[0]
-
-            self.progress["maximum"] = total_chunks
-            self.progress["value"] = 0
-
-            for i in range(total_chunks):
-                self.status_var.set(f"正在生成第 {i+1}/{total_chunks} 个文档...")
-                
-                start_idx = i * chunk_size
-                end_idx = min((i + 1) * chunk_size, total_rows)
-                chunk_df = df.iloc[start_idx:end_idx]
-
-                # 创建 Word 文档
-                doc = Document()
-                
-                # 动态生成表格：行数=数据行+1(表头)，列数=CSV列数
-                table = doc.add_table(rows=len(chunk_df) + 1, cols=col_count)
-                table.style = 'Table Grid'
-                table.alignment = WD_TABLE_ALIGNMENT.CENTER
-
-                # 写入表头并设置字体
-                for col_idx, col_name in enumerate(columns):
-                    self.set_cell_font(table.cell(0, col_idx), col_name)
-
-                # 写入数据行
-                for row_idx, (_, row) in enumerate(chunk_df.iterrows(), start=1):
-                    for col_idx in range(col_count):
-                        cell_value = row.iloc[col_idx]
-                        # 处理空值 (NaN)
-                        if pd.isna(cell_value):
-                            cell_value = ""
-                        self.set_cell_font(table.cell(row_idx, col_idx), cell_value)
-
-                # 保存当前分卷文档
-                output_filename = os.path.join(output_dir, f"{base_name}_排版输出_Part{i+1}.docx")
-                doc.save(output_filename)
-                
-                # 更新进度条
-                self.progress["value"] = i + 1
-                self.root.update_idletasks()
-
-            self.status_var.set("转换彻底完成！请查看 CSV 所在文件夹。")
+    @staticmethod
+    def build_table_xml(doc, columns, rows):
+        """快速写表：表格属性仍由 python-docx 生成，全部行拼成一段 XML 一次解析后整体并入表格"""
+        table = doc.add_table(rows=0, cols=len(columns))
+        table.style = 'Table Grid'
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        style_id = add_table_run_style(doc)
+
+        # 每列单元格的开头 (列宽与 add_table 逐格生成的 tcW 相同)
+        cell_heads = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{grid_col.get(qn("w:w"))}"/></w:tcPr><w:p>'
+                      for grid_col in table._tbl.tblGrid.gridCol_lst]
+        body = []
+        for values in [[str(name) for name in columns]] + rows:
+            body.append('<w:tr>')
+            body.extend(f'{head}{run_xml(value, style_id)}</w:p></w:tc>' for head, value in zip(cell_heads, values))
+            body.append('</w:tr>')
+        table._tbl.extend(parse_xml(f'<w:tbl {nsdecls("w")}>{"".join(body)}</w:tbl>'))
+        return table
+
+    @staticmethod
+    def build_document(columns, rows, fast_table=True):
+        """生成单个分卷文档：表头 + 已转为字符串的数据行；fast_table=False 时沿用逐格 python-docx 写入"""
+        # 创建 Word 文档
+        doc = Document()
+        if fast_table:
+            CSVtoWordApp.build_table_xml(doc, columns, rows)
+            return doc
+
+        # 动态生成表格：行数=数据行+1(表头)，列数=CSV列数
+        table = doc.add_table(rows=len(rows) + 1, cols=len(columns))
+        table.style = 'Table Grid'
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+        # 写入表头并设置字体
+        for col_idx, col_name in enumerate(columns):
+            CSVtoWordApp.set_cell_font(table.cell(0, col_idx), col_name)
+
+        # 写入数据行 (空值已在 materialize_rows 中映射为空串)
+        for row_idx, values in enumerate(rows, start=1):
+            for col_idx, cell_value in enumerate(values):
+                CSVtoWordApp.set_cell_font(table.cell(row_idx, col_idx), cell_value)
+        return doc
+
+    def report_progress(self, status, fraction=None):
+        """工作线程只记录最新的状态文字与进度 (0~1)，由界面线程的 poll_progress 定时刷新"""
+        self.pending_progress = (status, fraction)
+
+    def poll_progress(self):
+        """界面线程定时把工作线程记录的进度写入进度条与状态栏，处理结束后弹出结果并恢复按钮"""
+        running = self.worker_thread is not None and self.worker_thread.is_alive()
+        update, self.pending_progress = self.pending_progress, None
+        if update is not None:
+            status, fraction = update
+            if fraction is not None:
+                self.progress["value"] = fraction
+            self.status_var.set(status)
+        if running:
+            self.root.after(UI_POLL_MS, self.poll_progress)
+            return
+
+        # 工作线程已结束：弹窗与按钮都只在界面线程中操作
+        self.btn_run.config(state=tk.NORMAL)
+        if self.run_error is not None:
+            messagebox.showerror("发生错误", f"处理过程中出现问题：\n{self.run_error}")
+        else:
             messagebox.showinfo("成功", "所有数据已成功转换为带有完美字体的 Word 表格！")
 
+    def process_data(self, fast_table, part_workers):
+        """工作线程：只做转换并记录进度，出错时把错误信息留给界面线程显示"""
+        try:
+            # 逐块读取并生成分卷，整个 CSV 不会一次性载入内存
+            convert_csv(self.csv_path, fast_table, part_workers, self.report_progress)
         except Exception as e:
-            messagebox.showerror("发生错误", f"处理过程中出现问题：\n{str(e)}")
-            self.status_var.set("处理失败")
-        finally:
-            self.btn_run.config(state=tk.NORMAL)
+            self.run_error = str(e)
+            self.report_progress("处理失败")
 
     def start_processing(self):
         if not self.csv_path:
             messagebox.showwarning("提示", "请先选择一个 CSV 文件！")
             return
-        
+        try:
+            fast_table = self.fast_table_var.get()
+            part_workers = max(1, self.part_workers_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showerror("错误", "分卷生成进程数必须是整数！")
+            return
+
+        self.run_error = None
+        self.btn_run.config(state=tk.DISABLED)
         # 开启独立线程处理，防止 GUI 界面假死
-        thread = threading.Thread(target=self.process_data)
-        thread.daemon = True
-        thread.start()
+        self.worker_thread = threading.Thread(target=self.process_data, args=(fast_table, part_workers))
+        self.worker_thread.daemon = True
+        self.worker_thread.start()
+        self.poll_progress()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包为 EXE 后进程池子进程需要
     root = tk.Tk()
     app = CSVtoWordApp(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,1809 @@
+"""
+PDF 提取共用核心：I-LOVE-PDF.py / clean-pdf.py / Ultimate_PDF_Extractor-pro.py 共用的解析、OCR、缓存、
+流式写出、断点续跑与批量调度，以及无界面命令行。各工具只选用自己的清洗配置 (CleaningProfile) 并提供图形界面
+"""
+import os
+import sys
+import re
+import signal
+import gc
+import json
+import bisect
+import math
+import time
+import sqlite3
+import hashlib
+import pickle
+import shutil
+import tempfile
+import argparse
+import queue
+import threading
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, CancelledError, wait
+from datetime import datetime
+import fitz  # PyMuPDF
+
+# ---------------------------------------------------------
+# 1. Tesseract 引擎自动寻路机制
+# ---------------------------------------------------------
+def setup_tesseract():
+    if os.name == 'nt':
+        potential_paths = [
+            r'C:/Software/Tesseract-OCR/tesseract.exe',
+            r'C:/Program Files/Tesseract-OCR/tesseract.exe',
+            r'C:/Program Files (x86)/Tesseract-OCR/tesseract.exe',
+            r'D:/Program Files/Tesseract-OCR/tesseract.exe'
+        ]
+        for path in potential_paths:
+            if os.path.exists(path):
+                global TESSERACT_CMD
+                TESSERACT_CMD = path
+                return True
+    return True if os.name != 'nt' else False
+
+TESSERACT_CMD = None  # Windows 下探测到的 tesseract 路径，首次 OCR 导入 pytesseract 时写入
+TESSERACT_AVAILABLE = setup_tesseract()
+
+TESSERACT_ENV = None  # 启动 tesseract 子进程使用的环境变量，None 时沿用本进程环境；由 limit_tesseract_threads 设置
+
+def get_pytesseract():
+    """首次 OCR 时才导入 pytesseract (连带 PIL)，命令行 --help 与纯文本层任务不承担这部分导入开销"""
+    import pytesseract
+    if TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    pytesseract.pytesseract.environ = TESSERACT_ENV if TESSERACT_ENV is not None else os.environ
+    return pytesseract
+
+def limit_tesseract_threads(limit=None):
+    """只为 tesseract 子进程设置 OpenMP 线程上限 (多个识别并发时避免线程超订；用户已设置 OMP_THREAD_LIMIT 时沿用)，
+    limit 为 None 时恢复沿用本进程环境。不改动本进程的 os.environ，GUI 或库调用方随后运行的其他代码不受影响"""
+    global TESSERACT_ENV
+    TESSERACT_ENV = None
+    if limit:
+        TESSERACT_ENV = dict(os.environ)
+        TESSERACT_ENV.setdefault("OMP_THREAD_LIMIT", str(limit))
+    if "pytesseract" in sys.modules:
+        get_pytesseract()
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pdf_extract_cache")
+
+def generate_safe_filename(original_path, output_dir, ext=".txt"):
+    """确定性的输出文件名：原名 + 源文件绝对路径的短哈希，同名不同目录的文件互不覆盖，重跑时指向同一输出"""
+    base_name = os.path.basename(original_path)
+    name_without_ext = os.path.splitext(base_name)[0]
+    path_digest = hashlib.sha1(os.path.normcase(os.path.abspath(original_path)).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_dir, f"{name_without_ext}_{path_digest}{ext}")
+
+# ---------------------------------------------------------
+# 2. 清洗引擎与清洗配置 (每个工具一套规则，解析与调度共用)
+# ---------------------------------------------------------
+# ★ I-LOVE-PDF：带学术引用处理与透明拦截的清洗引擎 ★
+# 整块丢弃规则表 (按优先级排列)：(拦截原因, 正则, 匹配方式)
+# 匹配方式: "search" 任意位置出现；"match" 从开头匹配；"fullmatch" 整块匹配。各规则可用 (?i:...) 局部忽略大小写
+DROP_RULES = (
+    ("学术下载水印", r'(?i:Downloaded from http)', "search"),
+    ("孤立日期", r'(?:[0-3]?\d\s+)?[A-Z][a-z]{2,8}\s+\d{4}', "fullmatch"),
+    ("孤立页码", r'(?i:[xvi]+|\d+)\s*$', "match"),
+)
+
+def compile_drop_rules(rules):
+    """把规则表编译为单个锚定在块首的交替正则，一次扫描即可得出命中的第一条规则；
+    返回 (正则, 分组名 -> 拦截原因)"""
+    anchors = {"search": (r'(?s:.*?)', ''), "match": ('', ''), "fullmatch": ('', r'\Z')}
+    alternatives, reasons = [], {}
+    for idx, (reason, pattern, mode) in enumerate(rules):
+        prefix, suffix = anchors[mode]
+        alternatives.append(f"(?P<r{idx}>{prefix}(?:{pattern}){suffix})")
+        reasons[f"r{idx}"] = reason
+    return re.compile("|".join(alternatives)), reasons
+
+class UltimateTextCleaner:
+    DROP_PATTERN, DROP_REASONS = compile_drop_rules(DROP_RULES)
+    # 连字符断词只从词首开始尝试 (与逐位置回溯的结果一致，但不在词中反复重试)；先用廉价的 HINT 判断是否存在断词
+    HYPHEN_BREAK_HINT = re.compile(r'[-\xad]\s*\n')
+    HYPHEN_BREAK_PATTERN = re.compile(r'(?<![a-zA-Z])([a-zA-Z]+)[-\xad]\s*\n\s*([a-zA-Z]+)')
+    # 引用数字以标点为锚点、向前断言两个字母；与空白压缩互不重叠，合并为一次替换
+    CITATION_PATTERN = re.compile(r'(?<=[a-zA-Z]{2})([\.\,\?!\'"]+)(\d{1,3})(?=\s|$)')
+    CITATION_SPACE_PATTERN = re.compile(r'(?<=[a-zA-Z]{2})(?P<mark>[\.\,\?!\'"]+)(?P<num>\d{1,3})(?=\s|$)|\s{2,}')
+
+    @staticmethod
+    def inspect_block(text, y0, y1, page_height, safe_mode):
+        """审查文本块，决定是保留还是拦截，并返回拦截原因"""
+        text = text.strip()
+        if not text:
+            return True, "空白符"
+
+        # 1. 绝对垃圾信息过滤 (规则表预编译为单个正则)
+        hit = UltimateTextCleaner.DROP_PATTERN.match(text)
+        if hit:
+            return True, UltimateTextCleaner.DROP_REASONS[hit.lastgroup]
+
+        # 2. 大写标题免死金牌 (即使在边缘也不拦截)
+        # 例如 "HOW DOES NATIVE ADVERTISING AFFECT SOCIETY AND DEMOCRACY?"
+        if text.isupper() and len(text) > 5:
+            return False, ""
+
+        # 3. 空间位置过滤 (顶部 8% 或 底部 8% 的极短文本)
+        is_top = y0 < (page_height * 0.08)
+        is_bottom = y1 > (page_height * 0.92)
+        words = text.split()
+        word_count = len(words)
+
+        if (is_top or is_bottom) and word_count < 10:
+            return True, "边缘页眉/页脚"
+
+        # 4. 严苛模式下的句法过滤 (安全模式下关闭，防止误杀短标题)
+        if not safe_mode:
+            if word_count < 6 and not text[-1] in ".?!\"'":
+                title_case_words = sum(1 for w in words if w.istitle())
+                if words and (title_case_words / len(words) > 0.6):
+                    return True, "无标点首字母大写(疑似署名)"
+
+        return False, ""
+
+    @staticmethod
+    def format_citations(text):
+        """
+        智能处理学术引用数字。
+        将单词后紧跟标点和数字的格式 (例如 industry.67)
+        转化为标准纯文本带括号格式 (例如 industry. [67])
+        """
+        # 匹配: 至少2个字母 + 标点(.,!?"') + 1到3位数字 + (空格或行尾)
+        return UltimateTextCleaner.CITATION_PATTERN.sub(r'\1 [\2]', text)
+
+    @staticmethod
+    def _replace_citation_space(m):
+        return f"{m.group('mark')} [{m.group('num')}]" if m.group('mark') else ' '
+
+    @staticmethod
+    def heal_text(text):
+        """修复文本内的连字符、多余换行，并格式化引用"""
+        if '\n' in text:
+            # 如果是全大写标题，直接空格缝合所有行
+            if not text.isupper() and UltimateTextCleaner.HYPHEN_BREAK_HINT.search(text):
+                # 修复连字符换行断词
+                text = UltimateTextCleaner.HYPHEN_BREAK_PATTERN.sub(r'\1\2', text)
+            # 将段内剩余换行转为空格
+            text = text.replace('\n', ' ')
+
+        # 处理文内引用数字，并压缩多余空格
+        return UltimateTextCleaner.CITATION_SPACE_PATTERN.sub(UltimateTextCleaner._replace_citation_space, text).strip()
+
+# ★ clean-pdf：多维 NLP 与空间感知清洗引擎 ★
+class SpatialTextCleaner:
+    @staticmethod
+    def inspect_block(text, y0, y1, page_height, safe_mode=True):
+        """基于空间坐标和NLP规则判定是否为干扰块 (页眉/页脚/署名/日期)，返回 (是否拦截, 原因)；不区分安全模式"""
+        text = text.strip()
+        if not text:
+            return True, "空白符"
+
+        # 1. 空间坐标判定：位于页面极高或极低处的短文本，大概率为页眉页脚
+        is_top = y0 < (page_height * 0.12)
+        is_bottom = y1 > (page_height * 0.88)
+        word_count = len(text.split())
+
+        if (is_top or is_bottom) and word_count < 15:
+            return True, "边缘页眉/页脚"
+
+        # 2. 正则模式识别：匹配孤立的日期 (如: 25 November 2025, Nov 25 2025)
+        if re.fullmatch(r'^(?:[0-3]?\d\s+)?[A-Z][a-z]{2,8}\s+\d{4}$', text):
+            return True, "孤立日期"
+
+        # 3. 正则模式识别：匹配包含罗马数字的前缀或孤立页码 (如: x Series Editor’s Introduction)
+        if re.match(r'^([xvi]+|\d+)\s+([A-Z].*)?$', text, re.IGNORECASE) and word_count < 8:
+            return True, "页码前缀"
+
+        # 4. 匹配学术文章特有的下载水印戳
+        if re.search(r'Downloaded from http', text, re.IGNORECASE):
+            return True, "学术下载水印"
+
+        # 5. NLP 句法试探：判定短署名或书名 (词数极少，无标点结尾，且首字母大写密集)
+        if word_count < 6 and not text[-1] in ".?!\"'":
+            # 计算大写字母开头的单词比例
+            words = text.split()
+            title_case_words = sum(1 for w in words if w.istitle())
+            if title_case_words / len(words) > 0.6:  # 如果大部分词首字母大写，多半是人名/书名
+                return True, "无标点首字母大写(疑似署名)"
+
+        return False, ""
+
+    @staticmethod
+    def heal_text(text):
+        """修复文本内的连字符和多余换行"""
+        # 修复连字符换行断词: "misin-\nformation" -> "misinformation"
+        text = re.sub(r'([a-zA-Z]+)[-\xad]\s*\n\s*([a-zA-Z]+)', r'\1\2', text)
+        # 将段内剩余换行转为空格
+        text = text.replace('\n', ' ')
+        # 压缩多余空格
+        return re.sub(r'\s{2,}', ' ', text).strip()
+
+# ★ Ultimate_PDF_Extractor-pro：高级 NLP 文本清洗引擎 ★
+class SmartTextCleaner:
+    @staticmethod
+    def inspect_block(text, y0, y1, page_height, safe_mode=True):
+        """只拦截孤立的页码 (如单独的一行 "x" 或 "12")，不看坐标与安全模式"""
+        if re.fullmatch(r'^(x|v|i+|\d+)\s*$', text.strip(), re.IGNORECASE):
+            return True, "孤立页码"
+        return False, ""
+
+    @staticmethod
+    def clean_block(text):
+        """对单个逻辑段落进行深度清洗"""
+        if not text or not text.strip():
+            return ""
+
+        # 规则 1: 清理特定学术下载水印/页眉页脚 (针对你提供的样本)
+        text = re.sub(r'Downloaded from http\S+\s+by guest on.*?\n?', '', text, flags=re.IGNORECASE)
+        
+        # 规则 2: 修复被连字符打断的英文单词 (例如 "misin-\nformation" -> "misinformation")
+        # \xad 是软连字符(soft hyphen)，也需要考虑进去
+        text = re.sub(r'([a-zA-Z]+)[-\xad]\s*\n\s*([a-zA-Z]+)', r'\1\2', text)
+        
+        # 规则 3: 将段落内的剩余单换行符替换为空格（重组自然段）
+        text = text.replace('\n', ' ')
+        
+        # 规则 4: 清除因替换产生的多余连续空格，保留单个空格
+        text = re.sub(r'\s{2,}', ' ', text)
+        
+        return text.strip()
+
+    heal_text = clean_block
+
+class CleaningProfile:
+    """清洗配置：块审查 / 修复规则 (cleaner 提供 inspect_block 与 heal_text)、排序与重复块索引开关、输出缝合方式"""
+
+    def __init__(self, name, cleaner, manifest_name, reading_order=True, repeat_scan=True, headings=False, page_markers=False):
+        self.name = name
+        self.cleaner = cleaner
+        self.manifest_name = manifest_name  # 批次清单文件名，存放在输出目录中
+        self.reading_order = reading_order  # 多栏 XY-cut 排序；关闭时保持 PyMuPDF 的原始块顺序
+        self.repeat_scan = repeat_scan  # 支持文档级重复页眉 / 页脚预扫描
+        self.headings = headings  # 缝合时全大写标题强制独立成段
+        self.page_markers = page_markers  # 逐页输出并以 "--- Page N ---" 分隔，不做跨页缝合
+
+PROFILES = {profile.name: profile for profile in (
+    CleaningProfile("i-love-pdf", UltimateTextCleaner, ".i-love-pdf-manifest.json", headings=True),
+    CleaningProfile("clean-pdf", SpatialTextCleaner, ".clean-pdf-manifest.json"),
+    CleaningProfile("ultimate-pro", SmartTextCleaner, ".ultimate-pdf-manifest.json", reading_order=False, repeat_scan=False, page_markers=True),
+)}
+DEFAULT_PROFILE = PROFILES["i-love-pdf"]
+
+# ---------------------------------------------------------
+# 3. 单页解析 (串行与进程池并行模式共用，保证输出逐字节一致)
+# ---------------------------------------------------------
+PAGE_RANGE_SIZE = 8  # 并行模式下每个子进程任务包含的页数
+OCR_QUEUE_LIMIT = 32  # 等待 OCR 的页面积压上限，超出后主循环等待队首完成，控制内存
+
+OCR_BASE_SCALE = 2              # 固定渲染倍率 (144 DPI)，未开启自适应分辨率时使用
+OCR_TARGET_FONT_PX = 24         # 自适应分辨率：正文渲染后的目标字高 (px)
+OCR_DEFAULT_FONT_PT = 10        # 页面没有可供估算的文本层时假定的正文字号
+OCR_SCALE_RANGE = (1.0, 6.0)    # 自适应倍率上下限
+OCR_MAX_PIXELS = 16_000_000     # 单次渲染像素上限，A3 及超大幅面扫描按面积收缩倍率
+OCR_MIN_REGION_RATIO = 0.01     # 区域模式下忽略面积不足页面 1% 的图片 (图标、装饰线等)
+
+class StageTimer:
+    """单页各阶段累计耗时 (秒) 与计数，供性能分析报告使用；未开启分析时传 NULL_TIMER，记录操作均为空操作"""
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.times = {}
+        self.counts = {}
+
+    def add(self, stage, started):
+        """累计自 started (time.perf_counter() 读数) 起到现在的耗时"""
+        if self.enabled:
+            self.times[stage] = self.times.get(stage, 0.0) + (time.perf_counter() - started)
+
+    def count(self, key, n=1):
+        if self.enabled:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def report(self):
+        return dict(stages=dict(self.times), counts=dict(self.counts))
+
+NULL_TIMER = StageTimer(enabled=False)
+
+def estimate_font_size(blocks):
+    """由文本块高度 / 行数估算正文字号 (pt) 并取中位数，没有文本块时返回 None"""
+    sizes = sorted((b[3] - b[1]) / (b[4].strip().count('\n') + 1) / 1.2 for b in blocks if b[6] == 0 and b[4].strip())
+    return sizes[len(sizes) // 2] if sizes else None
+
+def choose_ocr_scale(rect, font_size=None):
+    """自适应渲染倍率：把估算字号放大到目标像素高度，再按渲染面积封顶"""
+    scale = OCR_TARGET_FONT_PX / (font_size or OCR_DEFAULT_FONT_PT)
+    scale = max(OCR_SCALE_RANGE[0], min(scale, OCR_SCALE_RANGE[1]))
+    return min(scale, (OCR_MAX_PIXELS / max(abs(rect), 1)) ** 0.5)
+
+def render_ocr_image(page, grayscale=False, scale=OCR_BASE_SCALE, clip=None):
+    """渲染扫描页 (或裁剪区域)：直接以 pixmap 像素缓冲构建 PIL 图像，省去 PNG 编码再解码的往返"""
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip, colorspace=fitz.csGRAY if grayscale else fitz.csRGB)
+    mode = "L" if pix.n == 1 else "RGB"
+    from PIL import Image
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+
+def find_ocr_regions(page, blocks):
+    """区域模式：挑出没有文本层覆盖、且面积不可忽略的图片块"""
+    text_rects = [fitz.Rect(b[:4]) for b in blocks if b[6] == 0]
+    min_area = abs(page.rect) * OCR_MIN_REGION_RATIO
+    regions = []
+    for b in blocks:
+        rect = fitz.Rect(b[:4])
+        if b[6] != 1 or abs(rect) < min_area:
+            continue
+        if sum(abs(rect & r) for r in text_rects) >= abs(rect) * 0.5:
+            continue
+        regions.append(b)
+    return regions
+
+def plan_ocr_items(page, ocr_options, timer=NULL_TIMER):
+    """组装扫描页的 OCR 任务项 (按阅读顺序)：("image", 图像) 交给 tesseract，("text", 原始文本块列表) 为页面已有文本层；
+    区域模式只裁剪渲染没有文本层的图片区域，找不到区域或未开启时整页渲染"""
+    blocks = []
+    started = time.perf_counter()
+    if ocr_options["adaptive_dpi"] or ocr_options["regions_only"]:
+        # 保留图片块 (类型 1)，区域模式据此定位需要 OCR 的扫描区域
+        blocks = page.get_text("blocks", flags=fitz.TEXTFLAGS_BLOCKS | fitz.TEXT_PRESERVE_IMAGES)
+    font_size = estimate_font_size(blocks)
+    timer.add("ocr_layout", started)
+
+    def render(clip=None):
+        started = time.perf_counter()
+        scale = choose_ocr_scale(clip or page.rect, font_size) if ocr_options["adaptive_dpi"] else OCR_BASE_SCALE
+        image = render_ocr_image(page, ocr_options["grayscale"], scale, clip)
+        timer.add("ocr_render", started)
+        timer.count("ocr_images")
+        return ("image", image)
+
+    regions = find_ocr_regions(page, blocks) if ocr_options["regions_only"] else []
+    if not regions:
+        return [render()]
+
+    items, text_run = [], []
+    for b in sorted(regions + [b for b in blocks if b[6] == 0], key=lambda b: (b[1], b[0])):
+        if b[6] == 0:
+            text_run.append(b)
+            continue
+        if text_run:
+            items.append(("text", text_run))
+            text_run = []
+        items.append(render(fitz.Rect(b[:4])))
+    if text_run:
+        items.append(("text", text_run))
+    return items
+
+def recognize_ocr_items(ocr_items, ocr_lang, timer=NULL_TIMER):
+    """把任务项中的图像交给 tesseract (每张图像一个子进程)，返回可缓存的原始结果：
+    [("text", 文本层块) | ("ocr", 识别文本)]"""
+    ocr_results = []
+    for kind, payload in ocr_items:
+        if kind == "text":
+            ocr_results.append((kind, payload))
+            continue
+        started = time.perf_counter()
+        ocr_results.append(("ocr", get_pytesseract().image_to_string(payload, lang=ocr_lang)))
+        timer.add("ocr_tesseract", started)
+        payload.close()  # 识别完立即释放位图，不等垃圾回收
+    return ocr_results
+
+def clean_ocr_results(ocr_results, page_height, safe_mode, logs, timer=NULL_TIMER, records=None, cleaner=UltimateTextCleaner):
+    """按阅读顺序清洗 OCR 原始结果：识别文本按空行切分、修复，文本层块走常规审查；
+    传入 records 时识别文本块以 ocr=True、bbox 为空记入逐块记录"""
+    page_blocks_text = []
+    for kind, payload in ocr_results:
+        if kind == "text":
+            page_blocks_text.extend(clean_text_blocks(payload, page_height, safe_mode, logs, timer, records=records, cleaner=cleaner))
+            continue
+        started = time.perf_counter()
+        for b in payload.split('\n\n'):
+            if not b.strip():
+                continue
+            cleaned = cleaner.heal_text(b)
+            page_blocks_text.append(cleaned)
+            if records is not None:
+                records.append(block_record(None, cleaned, True, ocr=True))
+        timer.add("heal", started)
+    return page_blocks_text
+
+def ocr_page_blocks(i, ocr_items, ocr_lang, ocr_options, page_height, safe_mode, logs, page_cache=None, timer=NULL_TIMER, records=None, cleaner=UltimateTextCleaner):
+    """扫描页识别任务 (在 OCR 线程池中执行)：识别、写入缓存、清洗"""
+    ocr_results = recognize_ocr_items(ocr_items, ocr_lang, timer)
+    if page_cache is not None:
+        started = time.perf_counter()
+        page_cache.put_ocr(i, ocr_lang, ocr_options, ocr_results)
+        timer.add("cache_write", started)
+    return clean_ocr_results(ocr_results, page_height, safe_mode, logs, timer, records, cleaner)
+
+# 多栏版面阅读顺序 (XY-cut)
+COLUMN_GAP = 10  # 判定为栏间空白的最小水平间距 (pt)；行间只要不重叠即可切分
+COLUMN_MIN_WIDTH = 30  # 比这更窄的块 (居中页码、脚注标记等) 不参与分栏判定，避免跨过栏间空白把两栏粘连
+
+def _merge_spans(intervals, min_gap):
+    """合并一维区间：间距小于 min_gap 的区间并为一段，返回按坐标排序的 [起, 止] 列表"""
+    spans = []
+    for lo, hi in sorted(intervals):
+        if spans and lo - spans[-1][1] < min_gap:
+            spans[-1][1] = max(spans[-1][1], hi)
+        else:
+            spans.append([lo, hi])
+    return spans
+
+def _column_spans(blocks):
+    """各栏的水平覆盖区间；窄块不参与 (全是窄块时才用全部块)"""
+    wide = [(b[0], b[2]) for b in blocks if b[2] - b[0] >= COLUMN_MIN_WIDTH]
+    return _merge_spans(wide or [(b[0], b[2]) for b in blocks], COLUMN_GAP)
+
+def _split_blocks(blocks, lo, spans):
+    """按覆盖区间分组 (lo 为块在该轴上的起点下标)：块归入起点所在或左侧最近的区间，按坐标顺序返回各组"""
+    if len(spans) == 1:
+        return [blocks]
+    starts = [span[0] for span in spans]
+    groups = [[] for _ in spans]
+    for b in blocks:
+        groups[max(bisect.bisect_right(starts, b[lo]) - 1, 0)].append(b)
+    return groups
+
+def reading_order(blocks):
+    """XY-cut 阅读顺序：区域能被竖直空白切成多栏时逐栏从左到右递归；否则按水平空白切成横带，
+    栏结构一致的相邻横带先合并 (两栏段落间隙恰好对齐时不会被逐行交错)，再自上而下递归；
+    不可再切的区域按 (y, x) 排序。每层只做排序与线性扫描"""
+    if len(blocks) <= 1:
+        return list(blocks)
+    columns = _split_blocks(blocks, 0, _column_spans(blocks))
+    if len(columns) > 1:
+        return [b for column in columns for b in reading_order(column)]
+    groups, coverage = [], None
+    for band in _split_blocks(blocks, 1, _merge_spans(((b[1], b[3]) for b in blocks), 0)):
+        band_coverage = _column_spans(band)
+        if groups:
+            merged_coverage = _merge_spans(coverage + band_coverage, COLUMN_GAP)
+            if len(merged_coverage) > 1:
+                groups[-1].extend(band)
+                coverage = merged_coverage
+                continue
+        groups.append(list(band))
+        coverage = band_coverage
+    if len(groups) == 1:
+        return sorted(blocks, key=lambda b: (b[1], b[0]))
+    return [b for group in groups for b in reading_order(group)]
+
+# 跨页重复块 (页眉 / 页脚 / 水印) 索引参数
+REPEAT_GRID = 12  # 位置网格边长 (pt)：块按 (水平中心, 顶边) 落格，相邻格视为同一位置，容忍页码位数等造成的抖动
+REPEAT_MIN_PAGES = 3  # 至少在这么多个文本层页面的同一位置出现
+REPEAT_MIN_RATIO = 0.25  # 且至少覆盖文本层页面的这一比例 (奇偶页交替的页眉各占一半)
+REPEAT_MAX_WORDS = 20  # 只索引短块，正文段落不参与
+
+class RepeatingBlockIndex:
+    """文档级重复块索引：一次扫描全部文本层页面，以 (规范化文本摘要, 网格位置) 为键记录出现的页码；
+    在同一位置 (含相邻格) 反复出现的短块判定为页眉 / 页脚 / 水印。建索引与逐块查询均为 O(块数)"""
+    _DIGITS = re.compile(r'\d+')
+    _LETTER = re.compile(r'[^\W\d_]')  # 任意文字 (含中文)，不含数字与标点
+
+    def __init__(self):
+        self._pages = {}  # 键 -> 出现过的页码集合
+        self.text_pages = 0
+        self.repeating = set()
+
+    @staticmethod
+    def block_key(block):
+        """文本块的索引键；空块、超过 REPEAT_MAX_WORDS 的块与不含文字的块返回 None。
+        纯数字 / 标点块 (表格数值、图号、单独的页码) 不参与索引：数字规范化后它们在同一位置彼此相同，会被误判为页眉 / 页脚"""
+        words = block[4].split()
+        if not words or len(words) > REPEAT_MAX_WORDS or not RepeatingBlockIndex._LETTER.search(block[4]):
+            return None
+        normalized = RepeatingBlockIndex._DIGITS.sub("#", " ".join(words).lower())  # 页码等数字不参与比较
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+        return digest, int((block[0] + block[2]) / 2 // REPEAT_GRID), int(block[1] // REPEAT_GRID)
+
+    @staticmethod
+    def page_keys(blocks):
+        """一页文本块的索引键列表 (只取文本类型的块)"""
+        keys = (RepeatingBlockIndex.block_key(b) for b in blocks if b[6] == 0)
+        return [key for key in keys if key is not None]
+
+    def add_page(self, page_idx, keys):
+        self.text_pages += 1
+        for key in keys:
+            self._pages.setdefault(key, set()).add(page_idx)
+
+    def finalize(self):
+        """汇总相邻格的出现页数，定出重复键集合；之后只保留判定结果，分发到子进程的数据很小"""
+        min_pages = max(REPEAT_MIN_PAGES, math.ceil(self.text_pages * REPEAT_MIN_RATIO))
+        for key in self._pages:
+            digest, cx, cy = key
+            neighbours = [self._pages.get((digest, cx + dx, cy + dy), ()) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+            if sum(map(len, neighbours)) >= min_pages and len(set().union(*neighbours)) >= min_pages:
+                self.repeating.add(key)
+        self._pages = {}
+        return self
+
+    def is_repeating(self, block):
+        return bool(self.repeating) and self.block_key(block) in self.repeating
+
+def block_record(bbox, text, kept, reason=None, ocr=False):
+    """JSONL 输出的逐块记录 (页码由写出时补上)：bbox 为 [x0, y0, x1, y1]，OCR 识别文本没有坐标"""
+    return dict(bbox=[round(v, 2) for v in bbox] if bbox is not None else None, ocr=ocr, kept=kept, reason=reason, text=text)
+
+def clean_text_blocks(blocks, page_height, safe_mode, logs, timer=NULL_TIMER, repeats=None, records=None, cleaner=UltimateTextCleaner):
+    """审查并修复已排序的文本层块，被拦截的块写入日志；传入 repeats 时先按文档级重复块索引拦截；
+    传入 records 时为每个保留 / 拦截的块追加一条 block_record"""
+    page_blocks_text = []
+    for b in blocks:
+        if b[6] == 0:
+            x0, y0, x1, y1, block_text = b[0], b[1], b[2], b[3], b[4]
+            
+            # 进行审查并获取原因
+            started = time.perf_counter()
+            if repeats is not None and repeats.is_repeating(b):
+                is_noise, reason = True, "跨页重复页眉/页脚"
+            else:
+                is_noise, reason = cleaner.inspect_block(block_text, y0, y1, page_height, safe_mode)
+            timer.add("inspect", started)
+            
+            if is_noise:
+                timer.count(f"dropped:{reason}")
+                # 核心要求：明确告知用户过滤了什么
+                preview_text = block_text.replace('\n', ' ').strip()[:30]
+                if preview_text:
+                    logs.append(f"    🗑️ 拦截 [{reason}]: {preview_text}...")
+                if records is not None:
+                    records.append(block_record(b[:4], block_text, False, reason))
+                continue
+                
+            started = time.perf_counter()
+            cleaned = cleaner.heal_text(block_text)
+            timer.add("heal", started)
+            if cleaned:
+                timer.count("blocks_kept")
+                page_blocks_text.append(cleaned)
+            if records is not None:
+                records.append(block_record(b[:4], cleaned, True) if cleaned else block_record(b[:4], block_text, False, "空白符"))
+    return page_blocks_text
+
+DEFAULT_OCR_OPTIONS = dict(grayscale=False, adaptive_dpi=False, regions_only=False)
+
+def read_page_record(doc, i, page_cache=None, timer=NULL_TIMER):
+    """读取第 i 页的原始记录 (页高、文本长度、文本块)，优先取缓存；返回 (记录, 页面对象，命中缓存时为 None)"""
+    page = None
+    started = time.perf_counter()
+    record = page_cache.get_page(i) if page_cache is not None else None
+    timer.add("cache_read", started)
+    if record is None:
+        started = time.perf_counter()
+        page = doc[i]
+        # 内容流只解释一次：扫描件判定与分块共用同一个 TextPage
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_BLOCKS)  # 与 get_text() 默认的 TEXTFLAGS_TEXT 取值相同
+        record = {"height": page.rect.height, "text_len": len(page.get_text(textpage=textpage).strip())}
+        timer.add("get_text", started)
+        # 无论本次是否判定为扫描页都取出文本块 (从 TextPage 读取很廉价)，缓存后阈值调整复跑同样命中
+        started = time.perf_counter()
+        record["blocks"] = page.get_text("blocks", textpage=textpage)
+        timer.add("get_blocks", started)
+        if page_cache is not None:
+            started = time.perf_counter()
+            page_cache.put_page(i, record)
+            timer.add("cache_write", started)
+    else:
+        timer.count("cache_hits")
+    return record, page
+
+def extract_page_blocks(doc, i, scan_threshold, ocr_lang, safe_mode, ocr_pool=None, ocr_options=DEFAULT_OCR_OPTIONS, page_cache=None, timer=NULL_TIMER, repeats=None, records=None, cleaning=None):
+    """按清洗配置 cleaning (默认 I-LOVE-PDF) 解析第 i 页，返回 (清洗后的文本块列表，解析失败时为 None, 日志列表)；
+    传入 ocr_pool 时扫描页只在本线程渲染，识别交给线程池，文本块列表位置返回 Future；
+    传入 page_cache 时优先复用缓存的原始文本块与 OCR 结果，只重跑清洗；
+    传入 timer 时记录各阶段耗时与块计数 (OCR 阶段在线程池中继续记到同一个 timer)；
+    传入 repeats 时文本层页面按文档级重复块索引拦截页眉 / 页脚；
+    传入 records 列表时追加逐块记录 (与日志列表一样，扫描页在 OCR 线程中继续追加)"""
+    cleaning = cleaning or DEFAULT_PROFILE
+    page_blocks_text = []
+    logs = []
+    try:
+        record, page = read_page_record(doc, i, page_cache, timer)
+        page_height = record["height"]
+
+        if record["text_len"] < scan_threshold:
+            timer.count("ocr_pages")
+            started = time.perf_counter()
+            ocr_results = page_cache.get_ocr(i, ocr_lang, ocr_options) if page_cache is not None else None
+            timer.add("cache_read", started)
+            if ocr_results is not None:
+                timer.count("ocr_cache_hits")
+                logs.append(f"  ♻️ 第 {i+1} 页 OCR 结果取自缓存")
+                page_blocks_text = clean_ocr_results(ocr_results, page_height, safe_mode, logs, timer, records, cleaning.cleaner)
+            elif not TESSERACT_AVAILABLE:
+                logs.append(f"  ⚠️ 第 {i+1} 页疑似扫描件，但未配置 Tesseract，提取空白。")
+            else:
+                logs.append(f"  🔍 第 {i+1} 页启用 OCR ({ocr_lang})...")
+                ocr_items = plan_ocr_items(page or doc[i], ocr_options, timer)
+                task_args = (i, ocr_items, ocr_lang, ocr_options, page_height, safe_mode, logs, page_cache, timer, records, cleaning.cleaner)
+                if ocr_pool is not None:
+                    page_blocks_text = ocr_pool.submit(ocr_page_blocks, *task_args)
+                else:
+                    page_blocks_text = ocr_page_blocks(*task_args)
+        else:
+            blocks = record["blocks"]
+            if cleaning.reading_order:
+                started = time.perf_counter()
+                blocks = reading_order(blocks)  # 多栏论文按栏排序，跨页缝合不再左右交错
+                timer.add("sort", started)
+            page_blocks_text = clean_text_blocks(blocks, page_height, safe_mode, logs, timer, repeats, records, cleaning.cleaner)
+
+    except Exception as page_error:
+        logs.append(f"  ❌ 第 {i+1} 页解析异常: {str(page_error)}")
+        page_blocks_text = None
+
+    return page_blocks_text, logs
+
+def extract_page_range(pdf_path, start, end, scan_threshold, ocr_lang, safe_mode, ocr_options=DEFAULT_OCR_OPTIONS, page_cache=None, profile=False, repeats=None, with_records=False, cleaning=None):
+    """进程池任务：子进程独立打开 fitz 句柄，解析 [start, end) 范围内的页面，
+    返回 [(文本块列表, 日志列表, 逐块记录或 None, 页面分析数据或 None)]"""
+    doc = fitz.open(pdf_path)
+    try:
+        results = []
+        for i in range(start, end):
+            if _JOB_CONTROL is not None and _JOB_CONTROL.wait():
+                break  # 批次已取消：返回已完成的页，主进程随即丢弃
+            timer = StageTimer(enabled=profile)
+            records = [] if with_records else None
+            page_blocks_text, logs = extract_page_blocks(doc, i, scan_threshold, ocr_lang, safe_mode, ocr_options=ocr_options,
+                                                         page_cache=page_cache, timer=timer, repeats=repeats, records=records, cleaning=cleaning)
+            results.append((page_blocks_text, logs, records, timer.report() if profile else None))
+        return results
+    finally:
+        doc.close()
+
+REPEAT_SCAN_RANGE = 64  # 并行模式下重复块预扫描每个子进程任务包含的页数
+
+def scan_repeat_keys(doc, i, scan_threshold, page_cache=None):
+    """重复块预扫描：返回第 i 页文本层短块的索引键；将走 OCR 的扫描页或解析失败的页返回 None"""
+    try:
+        record, _ = read_page_record(doc, i, page_cache)
+    except Exception:
+        return None  # 正式解析阶段会再次报告该页的异常
+    if record["text_len"] < scan_threshold:
+        return None
+    return RepeatingBlockIndex.page_keys(record["blocks"])
+
+def scan_repeat_range(pdf_path, start, end, scan_threshold, page_cache=None):
+    """进程池任务：预扫描 [start, end) 范围内页面的重复块索引键 (原始记录顺带写入提取缓存或临时页面记录，正式解析直接命中)"""
+    doc = fitz.open(pdf_path)
+    try:
+        keys = [scan_repeat_keys(doc, i, scan_threshold, page_cache) for i in range(start, end)]
+        if isinstance(page_cache, PageRecordSpill):
+            page_cache.flush()
+        return keys
+    finally:
+        doc.close()
+
+# ---------------------------------------------------------
+# 4. 持久化提取缓存 (内容寻址，复跑只重做清洗与缝合)
+# ---------------------------------------------------------
+def hash_file(path, chunk_size=1024 * 1024):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class ExtractionCache:
+    """SQLite 磁盘缓存：按文件内容哈希 + 页码存储原始文本块与 OCR 结果，超出容量按 LRU 淘汰。
+    缓存的是清洗前的原始数据，因此安全模式等清洗参数不进键；OCR 结果的键包含语言与渲染选项。
+    淘汰时先删可廉价重建的文本块记录，OCR 结果最后才删。"""
+    EVICT_CHECK_INTERVAL = 64  # 每写入若干条检查一次总容量
+
+    def __init__(self, cache_dir, max_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_mb = max_mb
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._puts = 0
+
+    def __getstate__(self):
+        # 随进程池任务传递时只携带配置，子进程首次访问时各自建立连接
+        return {"cache_dir": self.cache_dir, "max_mb": self.max_mb}
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_dir"], state["max_mb"])
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.cache_dir, "extract_cache.sqlite3"),
+                                   timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, kind TEXT, value TEXT, size INTEGER, last_used REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries (last_used)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, kind, value):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (key, kind, data, len(data.encode('utf-8')), time.time()))
+            self._puts += 1
+            if self._puts % self.EVICT_CHECK_INTERVAL == 0:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        max_bytes = self.max_mb * 1024 * 1024
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= max_bytes:
+            return
+        excess = total - max_bytes * 0.9  # 一次多腾出 10%，避免每次写入都触发淘汰
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY kind = 'ocr', last_used").fetchall():
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def for_document(self, pdf_path):
+        return DocumentCache(self, hash_file(pdf_path))
+
+class DocumentCache:
+    """绑定单个文件内容哈希的缓存视图，可随进程池任务传递"""
+    def __init__(self, cache, file_hash):
+        self.cache = cache
+        self.file_hash = file_hash
+
+    def get_page(self, i):
+        return self.cache.get(f"{self.file_hash}:{i}:page")
+
+    def put_page(self, i, record):
+        self.cache.put(f"{self.file_hash}:{i}:page", "page", record)
+
+    def _ocr_key(self, i, ocr_lang, ocr_options):
+        options = ",".join(f"{k}={v}" for k, v in sorted(ocr_options.items()))
+        return f"{self.file_hash}:{i}:ocr:{ocr_lang}:{options}"
+
+    def get_ocr(self, i, ocr_lang, ocr_options):
+        return self.cache.get(self._ocr_key(i, ocr_lang, ocr_options))
+
+    def put_ocr(self, i, ocr_lang, ocr_options, ocr_results):
+        self.cache.put(self._ocr_key(i, ocr_lang, ocr_options), "ocr", ocr_results)
+
+class PageRecordSpill:
+    """未启用持久化缓存时的单文档临时页面记录：重复块预扫描按 REPEAT_SCAN_RANGE 页一段把原始记录写入临时目录，
+    正式解析按段读回，每页的内容流只解释一次，内存中最多保留一段记录。
+    接口与 DocumentCache 相同，可随进程池任务传递；writable 为 False 时只读 (正式解析阶段)，不缓存 OCR 结果"""
+
+    def __init__(self, spill_dir, writable=True):
+        self.spill_dir = spill_dir
+        self.writable = writable
+        self._pending = {}  # 写入中的当前段：页码 -> 记录
+        self._loaded = (None, {})  # 最近读回的段：(段号, 页码 -> 记录)
+
+    def __getstate__(self):
+        return {"spill_dir": self.spill_dir, "writable": self.writable}
+
+    def __setstate__(self, state):
+        self.__init__(state["spill_dir"], state["writable"])
+
+    def _path(self, segment):
+        return os.path.join(self.spill_dir, f"{segment}.pickle")
+
+    def get_page(self, i):
+        if self.writable:
+            return None  # 预扫描阶段每页都是首次读取
+        segment = i // REPEAT_SCAN_RANGE
+        if self._loaded[0] != segment:
+            try:
+                with open(self._path(segment), "rb") as f:
+                    self._loaded = (segment, pickle.load(f))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self._loaded = (segment, {})  # 该段未写出 (预扫描被取消)，正式解析重新读取页面
+        return self._loaded[1].get(i)
+
+    def put_page(self, i, record):
+        if not self.writable:
+            return
+        if self._pending and next(iter(self._pending)) // REPEAT_SCAN_RANGE != i // REPEAT_SCAN_RANGE:
+            self.flush()
+        self._pending[i] = record
+
+    def flush(self):
+        """把当前段写入临时目录 (先写临时文件再改名，读方不会看到半个段)"""
+        if not self._pending:
+            return
+        path = self._path(next(iter(self._pending)) // REPEAT_SCAN_RANGE)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(self._pending, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        self._pending = {}
+
+    def get_ocr(self, i, ocr_lang, ocr_options):
+        return None
+
+    def put_ocr(self, i, ocr_lang, ocr_options, ocr_results):
+        pass
+
+# ---------------------------------------------------------
+# 5. 稳健型核心处理 Worker
+# ---------------------------------------------------------
+def current_rss_mb():
+    """当前进程常驻内存 (MB)：优先 psutil，Linux 下退回 /proc，均不可用时返回 None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def kill_ocr_subprocesses():
+    """终止本进程派生的全部 tesseract 进程 (含进程池子进程派生的)，返回终止的个数；
+    优先 psutil，Linux 下退回 /proc，均不可用时返回 0 (只能等当前识别自然结束)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        killed = 0
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                if proc.name().lower().startswith("tesseract"):
+                    proc.kill()
+                    killed += 1
+            except psutil.Error:
+                pass
+        return killed
+    try:
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        return 0
+    children = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue  # 读取期间已退出的进程
+        name, fields = stat[stat.index("(") + 1:stat.rindex(")")], stat[stat.rindex(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append((int(pid), name))
+    killed, stack = 0, [os.getpid()]
+    while stack:
+        for pid, name in children.get(stack.pop(), ()):
+            stack.append(pid)
+            if name.lower().startswith("tesseract"):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    killed += 1
+                except OSError:
+                    pass
+    return killed
+
+class JobControl:
+    """批次的取消 / 暂停开关：基于 multiprocessing.Event，经进程池初始化函数共享给子进程；
+    页面循环在页边界调用 wait() 响应暂停与取消"""
+
+    def __init__(self):
+        self._cancelled = multiprocessing.Event()
+        self._running = multiprocessing.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        """取消：唤醒暂停中的循环并立即终止正在运行的 tesseract，返回终止的进程数"""
+        self._cancelled.set()
+        self._running.set()
+        return kill_ocr_subprocesses()
+
+    def wait(self):
+        """页边界检查点：暂停时阻塞到继续或取消，返回是否已取消"""
+        self._running.wait()
+        return self.cancelled
+
+_JOB_CONTROL = None  # 进程池子进程中由 install_job_control 设置
+
+def install_job_control(control):
+    """进程池初始化函数：子进程共享主进程的取消 / 暂停开关"""
+    global _JOB_CONTROL
+    _JOB_CONTROL = control
+
+def stop_ocr_futures(futures, control):
+    """收尾：撤销尚未开始的 OCR 任务；已取消的批次持续终止 tesseract 直到在途识别全部退出"""
+    running = [f for f in futures if not f.cancel()]
+    while control.cancelled and running:
+        kill_ocr_subprocesses()
+        running = list(wait(running, timeout=0.1).not_done)
+
+class MemoryBudget:
+    """常驻内存预算 (按进程计)：超出时清空 MuPDF 资源缓存并回收垃圾，仍超出则由调用方排空 OCR 积压；
+    budget_mb 为 None 时不做检查"""
+    RELEASE_INTERVAL = 0.5  # 两次强制释放之间的最短间隔 (秒)，内存碎片导致 RSS 回落不及时时避免每页都回收
+
+    def __init__(self, budget_mb=None):
+        self.budget_mb = budget_mb
+        self._last_release = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.budget_mb) and current_rss_mb() is not None
+
+    def exceeded(self):
+        if not self.budget_mb:
+            return False
+        rss = current_rss_mb()
+        if rss is None or rss <= self.budget_mb:
+            return False
+        now = time.monotonic()
+        if now - self._last_release >= self.RELEASE_INTERVAL:
+            self._last_release = now
+            fitz.TOOLS.store_shrink(100)
+            gc.collect()
+            rss = current_rss_mb()
+        return rss > self.budget_mb
+
+CHECKPOINT_PAGES = 25  # 每缝合这么多页记录一次续跑检查点 (不足一个间隔的小文件只按文件记录)
+
+class JobManifest:
+    """批次断点清单：逐文件记录输出路径与完成状态，大文件额外记录页级检查点；
+    重跑时跳过已完成的文件、从检查点续写未完成的文件。源文件 (大小 / 修改时间) 或提取设置变化后对应记录自动失效"""
+
+    def __init__(self, output_dir, config, name=DEFAULT_PROFILE.manifest_name):
+        self.path = os.path.join(output_dir, name)
+        self.config = json.loads(json.dumps(config))  # 与读回的 JSON 同构，便于直接比较
+        self.entries = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass  # 没有清单或清单损坏时从头开始
+
+    @staticmethod
+    def _key(pdf_path):
+        return os.path.normcase(os.path.abspath(pdf_path))
+
+    @staticmethod
+    def _source_stamp(pdf_path):
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _valid_entry(self, pdf_path):
+        entry = self.entries.get(self._key(pdf_path))
+        if entry and entry.get("source") == self._source_stamp(pdf_path) and entry.get("config") == self.config:
+            return entry
+        return None
+
+    def completed_output(self, pdf_path):
+        """已完成且输出仍在时返回输出路径"""
+        entry = self._valid_entry(pdf_path)
+        if entry and entry.get("status") == "done" and os.path.exists(entry.get("output", "")):
+            return entry["output"]
+        return None
+
+    def resume_point(self, pdf_path, output_path):
+        """返回可续跑的页级检查点；临时文件缺失或短于检查点时视为不可续跑"""
+        entry = self._valid_entry(pdf_path)
+        if not entry or entry.get("status") != "partial" or entry.get("output") != output_path:
+            return None
+        checkpoint = entry.get("checkpoint") or {}
+        part_path = output_path + ".part"
+        if not os.path.exists(part_path) or os.path.getsize(part_path) < checkpoint.get("offset", 0):
+            return None
+        return checkpoint
+
+    def checkpoint(self, pdf_path, output_path, state):
+        self._update(pdf_path, output=output_path, status="partial", checkpoint=state)
+
+    def mark_done(self, pdf_path, output_path):
+        self._update(pdf_path, output=output_path, status="done")
+
+    def _update(self, pdf_path, **fields):
+        self.entries[self._key(pdf_path)] = dict(source=self._source_stamp(pdf_path), config=self.config, **fields)
+        self.save()
+
+    def save(self):
+        """先写临时文件再原子替换，进程中途退出也不会留下半截清单"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(version=1, files=self.entries), f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.path)
+
+def dedupe_pdf_paths(pdf_paths):
+    """按规范化的绝对路径 (与批次清单同一键) 去掉重复输入，保留首次出现的顺序；
+    同一文件的输出文件名相同，重复调度会让两个任务争用同一个临时文件"""
+    seen = set()
+    unique = []
+    for pdf_path in pdf_paths:
+        key = JobManifest._key(pdf_path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(pdf_path)
+    return unique
+
+class PartFileWriter:
+    """逐页输出原样写出：先写入 .part 临时文件，完成后原子替换；支持检查点续写"""
+
+    def __init__(self, output_path, resume=None):
+        self.output_path = output_path
+        self._part_path = output_path + ".part"
+        self._tail = ""  # 尚未定型的末尾空白 (可能被后续片段接续或在收尾时去掉)
+        self._started = False
+        if resume is None:
+            self._file = open(self._part_path, 'w', encoding='utf-8')
+        else:
+            # 从检查点续写：截掉检查点之后写入的内容，恢复末尾空白状态
+            with open(self._part_path, 'r+b') as f:
+                f.truncate(resume["offset"])
+            self._file = open(self._part_path, 'a', encoding='utf-8')
+            self._tail, self._started = resume["tail"], resume["started"]
+
+    def write(self, fragment):
+        self._file.write(fragment)
+
+    def close(self):
+        """正常收尾：替换为正式输出文件"""
+        self._file.close()
+        os.replace(self._part_path, self.output_path)
+
+    def abort(self):
+        """异常收尾：删除临时文件，不留下半截输出"""
+        self._file.close()
+        if os.path.exists(self._part_path):
+            os.remove(self._part_path)
+
+    def checkpoint(self):
+        """落盘已写内容，返回续写所需的状态 (临时文件字节偏移与末尾空白)"""
+        self._file.flush()
+        return dict(offset=self._file.buffer.tell(), tail=self._tail, started=self._started)
+
+    def suspend(self):
+        """中断收尾：保留临时文件，供下次从检查点续写"""
+        self._file.close()
+
+class StreamingTextWriter(PartFileWriter):
+    """流式写出缝合后的正文：片段一到即落盘，只在内存中保留末尾尚未定型的空白；
+    输出与整篇拼接后 strip() 并压缩连续换行的结果逐字节一致"""
+    _EXTRA_NEWLINES = re.compile(r'\n{3,}')
+
+    def write(self, fragment):
+        text = self._tail + fragment
+        cut = len(text.rstrip())
+        self._tail = text[cut:]
+        text = text[:cut]
+        if not text:
+            return
+        if not self._started:
+            text = text.lstrip()
+            self._started = True
+        self._file.write(self._EXTRA_NEWLINES.sub('\n\n', text))
+
+class JsonlBlockWriter(PartFileWriter):
+    """JSONL 输出：每个保留 / 拦截的块一行记录，逐页追加落盘，不做跨块缝合"""
+
+    def write_records(self, page_number, records):
+        for record in records:
+            self._file.write(json.dumps(dict(page=page_number, **record), ensure_ascii=False) + "\n")
+
+OUTPUT_WRITERS = {"txt": (".txt", StreamingTextWriter), "jsonl": (".jsonl", JsonlBlockWriter)}  # 逐页标记的纯文本改用 PartFileWriter 原样写出
+
+class PDFProcessorWorker:
+    def __init__(self, pdf_paths, output_dir, scan_threshold, ocr_lang, safe_mode, gui_callback, log_callback, finish_callback, page_workers=1, file_workers=1, ocr_workers=None, ocr_grayscale=False, ocr_adaptive_dpi=False, ocr_regions_only=False, cache_dir=None, cache_max_mb=1024, profile_path=None, memory_budget_mb=None, resume=False, repeat_scan=True, output_format="txt", cleaning_profile=DEFAULT_PROFILE.name):
+        if cleaning_profile not in PROFILES:
+            raise ValueError(f"未知的清洗配置: {cleaning_profile}")
+        self.cleaning_profile = cleaning_profile
+        self.cleaning = PROFILES[cleaning_profile]  # 块审查与修复规则、阅读顺序与缝合方式
+        self.pdf_paths = pdf_paths
+        self.output_dir = output_dir
+        self.scan_threshold = scan_threshold
+        self.ocr_lang = ocr_lang
+        self.safe_mode = safe_mode
+        self.gui_callback = gui_callback
+        self.log_callback = log_callback
+        self.finish_callback = finish_callback
+        self.page_workers = max(1, page_workers)  # >1 时启用进程池按页段并行解析
+        self.page_pool = None
+        self.file_workers = max(1, file_workers)  # >1 且多文件时启用多文件并发调度
+        self.ocr_workers = ocr_workers or os.cpu_count() or 1  # 扫描页 OCR 线程池大小，与文本层解析并行
+        self.ocr_grayscale = ocr_grayscale  # OCR 以灰度渲染，位图内存约为 RGB 的 1/3
+        self.ocr_adaptive_dpi = ocr_adaptive_dpi  # 按页面尺寸与估算字号自动选择渲染倍率
+        self.ocr_regions_only = ocr_regions_only  # 只 OCR 没有文本层的图片区域
+        self.ocr_options = dict(grayscale=ocr_grayscale, adaptive_dpi=ocr_adaptive_dpi, regions_only=ocr_regions_only)
+        self.cache_dir = cache_dir  # 为 None 时不启用持久化提取缓存
+        self.cache_max_mb = cache_max_mb
+        self.cache = ExtractionCache(cache_dir, cache_max_mb) if cache_dir else None
+        self.profile_path = profile_path  # 设置后记录逐页各阶段耗时与计数，批次结束写出 JSON 性能报告
+        self.profile = bool(profile_path)
+        self.file_profiles = []
+        self.memory_budget_mb = memory_budget_mb  # 每个进程的常驻内存上限 (MB)，超出时释放缓存并排空 OCR 积压
+        self.memory_budget = MemoryBudget(memory_budget_mb)
+        self.repeat_scan = repeat_scan and self.cleaning.repeat_scan  # 解析前先做文档级重复块预扫描，拦截跨页重复的页眉 / 页脚 / 水印
+        if output_format not in OUTPUT_WRITERS:
+            raise ValueError(f"不支持的输出格式: {output_format}")
+        self.output_format = output_format  # "txt" 缝合后的正文；"jsonl" 逐块记录 (页码、坐标、文本、拦截原因、是否 OCR)
+        self.resume = resume  # 按输出目录中的批次清单跳过已完成文件、从检查点续跑未完成文件
+        self.manifest = None
+        self.checkpoint_callback = None  # (源文件, 输出路径, 检查点状态)，由批次清单或子进程事件队列接收
+        self.control = JobControl()  # 取消 / 暂停开关，多进程模式下共享给进程池子进程
+        self.results = []  # 逐文件处理结果，供命令行 / 库调用汇总
+
+    @property
+    def is_cancelled(self):
+        return self.control.cancelled
+
+    @is_cancelled.setter
+    def is_cancelled(self, value):
+        if value:
+            self.cancel()
+
+    def cancel(self):
+        """取消批次：在途页面 (含进程池子进程) 在下一个页边界停止，正在运行的 tesseract 立即终止"""
+        killed = self.control.cancel()
+        if killed:
+            self.log_callback(f"⏹️ 已终止 {killed} 个正在运行的 OCR 进程")
+
+    def run(self):
+        started = time.perf_counter()
+        if self.memory_budget_mb and not self.memory_budget.enabled:
+            self.log_callback("⚠️ 无法读取进程内存 (未安装 psutil)，内存预算不生效")
+        unique_paths = dedupe_pdf_paths(self.pdf_paths)
+        if len(unique_paths) < len(self.pdf_paths):
+            self.log_callback(f"⚠️ 跳过 {len(self.pdf_paths) - len(unique_paths)} 个重复的输入文件")
+            self.pdf_paths = unique_paths
+        if self.resume:
+            self.manifest = JobManifest(self.output_dir, self._job_config(), self.cleaning.manifest_name)
+            self.checkpoint_callback = self.manifest.checkpoint
+        if self.file_workers > 1 and len(self.pdf_paths) > 1:
+            self._run_concurrent()
+        else:
+            self._run_serial()
+        if self.profile:
+            write_profile_report(self.profile_path, self.file_profiles, self._profile_settings(), time.perf_counter() - started, self.cleaning_profile)
+            self.log_callback(f"📊 性能分析报告已写入: {self.profile_path}")
+        self.finish_callback()
+
+    def _profile_settings(self):
+        return dict(cleaning_profile=self.cleaning_profile, scan_threshold=self.scan_threshold, ocr_lang=self.ocr_lang, safe_mode=self.safe_mode,
+                    page_workers=self.page_workers, file_workers=self.file_workers, ocr_workers=self.ocr_workers,
+                    ocr_options=self.ocr_options, cache=self.cache is not None, repeat_scan=self.repeat_scan,
+                    output_format=self.output_format)
+
+    def _job_config(self):
+        """影响输出内容的设置，任一变化都会使批次清单中的记录失效"""
+        return dict(cleaning_profile=self.cleaning_profile, scan_threshold=self.scan_threshold, ocr_lang=self.ocr_lang, safe_mode=self.safe_mode,
+                    ocr_options=self.ocr_options, repeat_scan=self.repeat_scan, output_format=self.output_format)
+
+    def _record_result(self, file_idx, pdf_path, output_path, error=None):
+        if error is not None:
+            status, output_path = "error", None
+        else:
+            status = "cancelled" if self.is_cancelled else "ok"
+        if status == "cancelled" and output_path and not os.path.exists(output_path):
+            output_path = None  # 中断后只留下续跑用的临时文件
+        if status == "ok" and self.manifest is not None:
+            self.manifest.mark_done(pdf_path, output_path)
+        self.results.append(dict(index=file_idx, pdf=pdf_path, output=output_path, status=status, error=error))
+
+    def _plan_file(self, file_idx, pdf_path, total_files):
+        """确定输出路径与续跑检查点；批次清单中已完成的文件直接记为 skipped 并返回 None"""
+        output_path = generate_safe_filename(pdf_path, self.output_dir, OUTPUT_WRITERS[self.output_format][0])
+        if self.manifest is None:
+            return output_path, None
+        done_output = self.manifest.completed_output(pdf_path)
+        if done_output is not None:
+            self.log_callback(f"\n[{file_idx+1}/{total_files}] ⏭️ 上次已完成，跳过: {os.path.basename(pdf_path)}")
+            self.results.append(dict(index=file_idx, pdf=pdf_path, output=done_output, status="skipped", error=None))
+            return None
+        return output_path, self.manifest.resume_point(pdf_path, output_path)
+
+    def _run_serial(self):
+        total_files = len(self.pdf_paths)
+        if self.page_workers > 1:
+            self.page_pool = ProcessPoolExecutor(max_workers=self.page_workers, initializer=install_job_control, initargs=(self.control,))
+            self.log_callback(f"⚡ 已启用 {self.page_workers} 进程并行页面解析")
+        try:
+            for file_idx, pdf_path in enumerate(self.pdf_paths):
+                if self.control.wait(): break
+                planned = self._plan_file(file_idx, pdf_path, total_files)
+                if planned is None:
+                    continue
+                output_path, resume = planned
+
+                self.log_callback(f"\n[{file_idx+1}/{total_files}] 🚀 开始提取: {os.path.basename(pdf_path)}")
+                try:
+                    self._process_single_pdf(pdf_path, output_path, file_idx, total_files, resume)
+                except Exception as e:
+                    self.log_callback(f"❌ 严重错误跳过: {str(e)}")
+                    self._record_result(file_idx, pdf_path, output_path, str(e))
+                    continue 
+                self._record_result(file_idx, pdf_path, output_path)
+        finally:
+            if self.page_pool is not None:
+                self.page_pool.shutdown(cancel_futures=True)
+                self.page_pool = None
+
+    def _run_concurrent(self):
+        """多文件并发调度：有界进程池，按页数从大到小派发以缩短批次尾部等待"""
+        total_files = len(self.pdf_paths)
+        page_counts = [count_pdf_pages(p) for p in self.pdf_paths]
+        order = sorted(range(total_files), key=lambda k: page_counts[k], reverse=True)
+        weights = [max(1, c) for c in page_counts]
+        file_progress = [0.0] * total_files
+        self.log_callback(f"📋 批量调度: {total_files} 个文件 / 共 {sum(page_counts)} 页，{self.file_workers} 路并发 (大文件优先)，每个文件 {max(1, self.ocr_workers // self.file_workers)} 个 OCR 线程")
+
+        settings = dict(scan_threshold=self.scan_threshold, ocr_lang=self.ocr_lang, safe_mode=self.safe_mode, ocr_grayscale=self.ocr_grayscale,
+                        ocr_adaptive_dpi=self.ocr_adaptive_dpi, ocr_regions_only=self.ocr_regions_only,
+                        cache_dir=self.cache_dir, cache_max_mb=self.cache_max_mb, profile_path=self.profile_path,
+                        memory_budget_mb=self.memory_budget_mb, repeat_scan=self.repeat_scan, output_format=self.output_format,
+                        cleaning_profile=self.cleaning_profile,
+                        # OCR 线程数在并发文件间均分，同时运行的 Tesseract 进程总数仍约为 ocr_workers
+                        ocr_workers=max(1, self.ocr_workers // self.file_workers))
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=self.file_workers, initializer=install_job_control, initargs=(self.control,)) as pool:
+            events = manager.Queue()
+            futures = {}
+            for file_idx in order:
+                pdf_path = self.pdf_paths[file_idx]
+                planned = self._plan_file(file_idx, pdf_path, total_files)
+                if planned is None:
+                    file_progress[file_idx] = 1.0
+                    continue
+                output_path, resume = planned
+                future = pool.submit(process_pdf_task, settings, pdf_path, output_path, file_idx, total_files, events,
+                                     resume, self.manifest is not None)
+                futures[future] = (file_idx, output_path)
+
+            pending = set(futures)
+            while pending:
+                if self.is_cancelled:
+                    for future in pending:
+                        future.cancel()
+                done, pending = wait(pending, timeout=0.2)
+                # 先转发子进程事件再处理已完成任务，避免迟到的进度覆盖完成状态
+                self._dispatch_events(events, file_progress)
+                for future in done:
+                    file_idx, output_path = futures[future]
+                    try:
+                        self.file_profiles.extend(future.result())
+                    except CancelledError:
+                        self._record_result(file_idx, self.pdf_paths[file_idx], None)
+                        continue
+                    except Exception as e:
+                        self.log_callback(f"❌ 严重错误跳过: {os.path.basename(self.pdf_paths[file_idx])} - {str(e)}")
+                        self._record_result(file_idx, self.pdf_paths[file_idx], output_path, str(e))
+                    else:
+                        self._record_result(file_idx, self.pdf_paths[file_idx], output_path)
+                    file_progress[file_idx] = 1.0
+                self.gui_callback(sum(w * f for w, f in zip(weights, file_progress)) / sum(weights))
+            self._dispatch_events(events, file_progress)
+
+    def _dispatch_events(self, events, file_progress):
+        """转发子进程回传的日志与续跑检查点，并记录各文件的单文件进度"""
+        while not events.empty():
+            kind, *payload = events.get()
+            if kind == "log":
+                self.log_callback(payload[0])
+            elif kind == "checkpoint":
+                self.manifest.checkpoint(*payload)
+            else:
+                file_idx, fraction = payload
+                file_progress[file_idx] = fraction
+
+    def _build_repeat_index(self, pdf_path, doc, total_pages, page_cache=None):
+        """文档级预扫描：收集全部文本层页面的短块位置与文本，建立跨页重复块索引 (并行模式下分段交给进程池)"""
+        index = RepeatingBlockIndex()
+        if self.page_pool is None or total_pages <= REPEAT_SCAN_RANGE:
+            page_keys = (scan_repeat_keys(doc, i, self.scan_threshold, page_cache) for i in range(total_pages))
+        else:
+            futures = [self.page_pool.submit(scan_repeat_range, pdf_path, start, min(start + REPEAT_SCAN_RANGE, total_pages),
+                                             self.scan_threshold, page_cache)
+                       for start in range(0, total_pages, REPEAT_SCAN_RANGE)]
+            page_keys = (keys for future in futures for keys in future.result())
+        for i, keys in enumerate(page_keys):
+            if self.is_cancelled: break
+            if keys is not None:
+                index.add_page(i, keys)
+        if isinstance(page_cache, PageRecordSpill):
+            page_cache.flush()
+        index.finalize()
+        if index.repeating:
+            self.log_callback(f"🧭 跨页重复块索引: {len(index.repeating)} 处重复的页眉/页脚/水印位置 (共 {index.text_pages} 个文本层页面)")
+        return index
+
+    def _iter_page_results(self, pdf_path, doc, total_pages, page_cache=None, start_page=0, repeats=None):
+        """从 start_page 起按页码顺序产出 (页码, 文本块列表, 日志列表, 逐块记录或 None, 页面分析数据或 None)，
+        并行模式下页段乱序完成但顺序交付"""
+        if self.page_pool is None or total_pages - start_page <= PAGE_RANGE_SIZE:
+            yield from self._iter_serial_page_results(doc, total_pages, page_cache, start_page, repeats)
+            return
+
+        # 只保持有限个页段在途，已完成但尚未缝合的结果不会随页数无限堆积
+        starts = iter(range(start_page, total_pages, PAGE_RANGE_SIZE))
+        submit = lambda start: self.page_pool.submit(
+            extract_page_range, pdf_path, start, min(start + PAGE_RANGE_SIZE, total_pages),
+            self.scan_threshold, self.ocr_lang, self.safe_mode, self.ocr_options, page_cache, self.profile, repeats,
+            self.output_format == "jsonl", self.cleaning)
+        futures = deque(submit(start) for start in itertools.islice(starts, self.page_workers * 2))
+        try:
+            i = start_page
+            while futures:
+                results = futures.popleft().result()
+                for start in itertools.islice(starts, 1):
+                    futures.append(submit(start))
+                for page_result in results:
+                    yield (i,) + page_result
+                    i += 1
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _iter_serial_page_results(self, doc, total_pages, page_cache=None, start_page=0, repeats=None):
+        """串行解析文本层页面，扫描页排入 OCR 线程池；队首页面就绪即按页码顺序交付缝合"""
+        pending = deque()
+        limit_tesseract_threads(1 if self.ocr_workers > 1 else None)
+        try:
+            with ThreadPoolExecutor(max_workers=self.ocr_workers) as ocr_pool:
+                try:
+                    for i in range(start_page, total_pages):
+                        if self.control.wait(): break
+                        timer = StageTimer(enabled=self.profile)
+                        records = [] if self.output_format == "jsonl" else None
+                        pending.append((i,) + extract_page_blocks(doc, i, self.scan_threshold, self.ocr_lang, self.safe_mode,
+                                                                     ocr_pool, self.ocr_options, page_cache, timer, repeats, records, self.cleaning) + (records, timer))
+                        # 超出内存预算时排空 OCR 积压，待识别的位图随之释放
+                        over_budget = self.memory_budget.exceeded()
+                        while pending and (over_budget or len(pending) > OCR_QUEUE_LIMIT or not isinstance(pending[0][1], Future) or pending[0][1].done()):
+                            yield self._resolve_page_result(*pending.popleft())
+                    while pending:
+                        yield self._resolve_page_result(*pending.popleft())
+                finally:
+                    stop_ocr_futures([f for _, f, *_ in pending if isinstance(f, Future)], self.control)
+        finally:
+            limit_tesseract_threads(None)  # 识别线程全部退出后再恢复
+
+    def _resolve_page_result(self, i, page_blocks_text, logs, records, timer):
+        """等待 OCR 结果落地，识别失败按页面解析异常记录 (文本块列表记为 None)"""
+        if isinstance(page_blocks_text, Future):
+            try:
+                page_blocks_text = page_blocks_text.result()
+            except Exception as page_error:
+                if not self.is_cancelled:  # 取消时被终止的 tesseract 不算解析异常
+                    logs.append(f"  ❌ 第 {i+1} 页解析异常: {str(page_error)}")
+                page_blocks_text = None
+        return i, page_blocks_text, logs, records, timer.report() if timer.enabled else None
+
+    def _process_single_pdf(self, pdf_path, output_path, file_idx, total_files, resume=None):
+        file_timer = StageTimer(enabled=self.profile)
+        file_started = started = time.perf_counter()
+        doc = fitz.open(pdf_path)
+        spill_dir = None
+        try:
+            total_pages = len(doc)
+            file_timer.add("open", started)
+            started = time.perf_counter()
+            page_cache = self.cache.for_document(pdf_path) if self.cache is not None else None
+            file_timer.add("hash", started)
+            repeats = None
+            if self.repeat_scan:
+                started = time.perf_counter()
+                if page_cache is None:
+                    # 没有持久化缓存时预扫描读到的原始记录暂存到临时目录，正式解析直接读回，不再二次解析页面
+                    spill_dir = tempfile.mkdtemp(prefix="pdf-extract-")
+                    repeats = self._build_repeat_index(pdf_path, doc, total_pages, PageRecordSpill(spill_dir))
+                    page_cache = PageRecordSpill(spill_dir, writable=False)
+                else:
+                    repeats = self._build_repeat_index(pdf_path, doc, total_pages, page_cache)
+                file_timer.add("repeat_scan", started)
+
+            stitch_state = dict(pages_done=0, has_text=False, incomplete=False)
+            if resume is not None:
+                stitch_state.update(pages_done=resume["pages_done"], has_text=resume["has_text"], incomplete=resume["incomplete"])
+                self.log_callback(f"⏩ 从第 {resume['pages_done'] + 1} 页续跑 (前 {resume['pages_done']} 页已在上次完成)")
+            page_profiles = []
+            writer = self._open_writer(output_path, resume)
+            save_checkpoint = None
+            if self.checkpoint_callback is not None:
+                save_checkpoint = lambda: self.checkpoint_callback(pdf_path, output_path, dict(stitch_state, **writer.checkpoint()))
+            page_results = self._iter_page_results(pdf_path, doc, total_pages, page_cache, stitch_state["pages_done"], repeats)
+            try:
+                self._stitch_pages(writer, page_results, file_idx, total_files, total_pages, page_profiles, stitch_state, save_checkpoint)
+            except BaseException:
+                if save_checkpoint is None:
+                    writer.abort()
+                else:
+                    writer.suspend()  # 保留临时文件，重跑时从最近的检查点续写
+                raise
+            finally:
+                page_results.close()  # 提前退出时立即回收 OCR 线程池与在途页段，再关闭文档
+        finally:
+            doc.close()
+            if spill_dir is not None:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+        if save_checkpoint is not None and stitch_state["pages_done"] < total_pages:
+            save_checkpoint()
+            writer.suspend()
+            self.log_callback(f"⏸️ 已中断于第 {stitch_state['pages_done']} 页，检查点已保存，重跑时自动续跑")
+            return
+        started = time.perf_counter()
+        writer.close()
+        file_timer.add("finalize", started)
+        self.log_callback(f"✅ 提取完成！已导出至: \n{output_path}")
+        if self.profile:
+            self.file_profiles.append(build_file_profile(pdf_path, time.perf_counter() - file_started, file_timer.report(), page_profiles))
+
+    def _open_writer(self, output_path, resume=None):
+        """按输出格式与清洗配置选择写出器：逐页标记的纯文本原样写出，其余按输出格式"""
+        if self.output_format == "txt" and self.cleaning.page_markers:
+            return PartFileWriter(output_path, resume)
+        return OUTPUT_WRITERS[self.output_format][1](output_path, resume)
+
+    def _stitch_pages(self, writer, page_results, file_idx, total_files, total_pages, page_profiles, stitch_state, save_checkpoint=None):
+        """逐页缝合并流式写出，内存中只保留跨块缝合所需的状态 (stitch_state，续跑时由检查点恢复)；
+        JSONL 模式下逐块记录原样写出、不做缝合；逐页标记配置下每页以 "--- Page N ---" 起头、不跨页缝合；
+        开启性能分析时收集逐页数据，每 CHECKPOINT_PAGES 页调用一次 save_checkpoint"""
+        has_text = stitch_state["has_text"]
+        previous_text_ends_incomplete = stitch_state["incomplete"]
+
+        for i, page_blocks_text, logs, page_records, page_profile in page_results:
+            if self.control.wait(): break  # 暂停时在页边界挂起
+            started = time.perf_counter()
+
+            for msg in logs:
+                self.log_callback(msg)
+
+            if page_records is not None:
+                writer.write_records(i + 1, page_records)
+                page_blocks_text = ()  # 逐块记录已包含全部文本，跳过缝合
+            elif self.cleaning.page_markers:
+                separator = "\n" if i else ""
+                if page_blocks_text is None:
+                    writer.write(f"{separator}--- Page {i+1} [EXTRACTION FAILED] ---\n")
+                else:
+                    writer.write(f"{separator}--- Page {i+1} ---\n" + "\n\n".join(page_blocks_text) + "\n")
+                page_blocks_text = ()
+
+            # 跨页缝合与标题排版逻辑
+            for text_chunk in page_blocks_text or ():
+                if not text_chunk: continue
+                
+                is_heading = self.cleaning.headings and text_chunk.isupper() and len(text_chunk) > 5
+                
+                if is_heading:
+                    # 如果是标题，强制独立段落
+                    writer.write(f"\n\n{text_chunk}\n\n")
+                    previous_text_ends_incomplete = False
+                else:
+                    starts_with_lower = text_chunk[0].islower()
+                    
+                    if previous_text_ends_incomplete and (starts_with_lower or text_chunk[0] in ",;:'\""):
+                        # 缝合上一句
+                        writer.write(" " + text_chunk)
+                    else:
+                        # 新起一段
+                        writer.write(("\n\n" if has_text else "") + text_chunk)
+                    
+                    # 判定结尾
+                    previous_text_ends_incomplete = text_chunk[-1] not in ".?!\"'"
+                has_text = True
+
+            if page_profile is not None:
+                page_profile["stages"]["stitch_write"] = time.perf_counter() - started
+                page_profiles.append(dict(page=i + 1, **page_profile))
+            stitch_state.update(pages_done=i + 1, has_text=has_text, incomplete=previous_text_ends_incomplete)
+            if save_checkpoint is not None and (i + 1) % CHECKPOINT_PAGES == 0:
+                save_checkpoint()
+            self.gui_callback((file_idx + ((i + 1) / total_pages)) / total_files)
+
+def count_pdf_pages(pdf_path):
+    """调度前快速探测页数，打不开的文件记为 0 页 (交由处理阶段报错)"""
+    try:
+        with fitz.open(pdf_path) as doc:
+            return len(doc)
+    except Exception:
+        return 0
+
+def process_pdf_task(settings, pdf_path, output_path, file_idx, total_files, events, resume=None, checkpoint=False):
+    """多文件调度的子进程任务：独立构造 Worker 处理单个文件，日志、进度与续跑检查点经队列回传主进程"""
+    worker = PDFProcessorWorker(
+        [pdf_path], os.path.dirname(output_path), **settings,
+        gui_callback=lambda v: events.put(("progress", file_idx, v)),
+        log_callback=lambda msg: events.put(("log", msg)),
+        finish_callback=lambda: None
+    )
+    if checkpoint:
+        worker.checkpoint_callback = lambda *state: events.put(("checkpoint",) + state)
+    if _JOB_CONTROL is not None:
+        worker.control = _JOB_CONTROL
+    events.put(("log", f"\n[{file_idx+1}/{total_files}] 🚀 开始提取: {os.path.basename(pdf_path)}"))
+    worker._process_single_pdf(pdf_path, output_path, 0, 1, resume)
+    return worker.file_profiles
+
+PROFILE_SLOWEST_PAGES = 10  # 性能报告中列出的最慢页数
+
+def merge_profiles(profiles):
+    """累加多份分析数据的各阶段耗时与计数"""
+    stages, counts = {}, {}
+    for profile in profiles:
+        for key, value in profile["stages"].items():
+            stages[key] = stages.get(key, 0.0) + value
+        for key, value in profile["counts"].items():
+            counts[key] = counts.get(key, 0) + value
+    return dict(stages={k: round(v, 6) for k, v in sorted(stages.items(), key=lambda kv: -kv[1])}, counts=dict(sorted(counts.items())))
+
+def build_file_profile(pdf_path, elapsed, file_profile, page_profiles):
+    """单个文件的性能数据：文件级阶段 + 逐页阶段汇总、最慢页面与逐页明细"""
+    for page in page_profiles:
+        page["total_sec"] = round(sum(page["stages"].values()), 6)
+        page["stages"] = {k: round(v, 6) for k, v in page["stages"].items()}
+    slowest = sorted(page_profiles, key=lambda p: p["total_sec"], reverse=True)[:PROFILE_SLOWEST_PAGES]
+    return dict(pdf=pdf_path, pages=len(page_profiles), elapsed_sec=round(elapsed, 6),
+                **merge_profiles([file_profile] + page_profiles),
+                slowest_pages=[dict(page=p["page"], total_sec=p["total_sec"]) for p in slowest],
+                page_details=page_profiles)
+
+def write_profile_report(path, file_profiles, settings, elapsed, tool=DEFAULT_PROFILE.name):
+    """写出整个批次的机器可读性能报告 (JSON)"""
+    report = dict(tool=tool, created=datetime.now().isoformat(timespec="seconds"), elapsed_sec=round(elapsed, 6),
+                  settings=settings, files_profiled=len(file_profiles), pages=sum(f["pages"] for f in file_profiles),
+                  totals=merge_profiles(file_profiles), files=file_profiles)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+# ---------------------------------------------------------
+# 6. GUI 共用部件 (各工具的界面布局各自定义，customtkinter 只在工具的 launch_gui 中导入)
+# ---------------------------------------------------------
+LOG_POLL_MS = 100  # 界面线程批量刷新日志与进度的间隔
+LOG_DRAIN_MAX = 5000  # 每次刷新最多取出的日志条数，余下的留到下一轮，界面始终可响应
+CONSOLE_MAX_LINES = 2000  # 控制台只保留最近的行数 (环形缓冲)，完整日志可另存为文件
+
+class LogChannel:
+    """线程安全的日志通道：工作线程只入队不碰界面，界面线程定时批量取出；指定 log_path 时完整日志同步追加到文件"""
+
+    def __init__(self, log_path=None):
+        self._queue = queue.SimpleQueue()
+        self.log_path = log_path
+        self._file = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def put(self, msg):
+        self._queue.put(msg)
+
+    def drain(self, limit=LOG_DRAIN_MAX):
+        """取出至多 limit 条已入队的日志 (limit 为 None 时全部取出)，并整批写入日志文件"""
+        batch = []
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch and self._file is not None:
+            self._file.write("\n".join(batch) + "\n")
+            self._file.flush()
+        return batch
+
+    def close(self):
+        """取出剩余日志后关闭日志文件，返回剩余的日志"""
+        batch = self.drain(None)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return batch
+
+class WorkerConsoleMixin:
+    """界面与 Worker 之间的共用部分：控制台批量刷新、进度合并、日志文件、暂停 / 取消按钮；
+    宿主窗口需提供 console_textbox、progress_bar，启动任务后设置 processor"""
+    log_channel = None
+    pending_progress = None
+    processor = None
+
+    def build_run_controls(self, ctk, parent, row):
+        """在 parent 的第 row 行放置暂停 / 取消按钮 (任务运行时才可用)"""
+        self.control_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.control_frame.grid(row=row, column=0, padx=20, pady=(0, 30))
+        self.btn_pause = ctk.CTkButton(self.control_frame, text="⏸️ 暂停", command=self.toggle_pause, width=110, state="disabled")
+        self.btn_pause.grid(row=0, column=0, padx=(0, 5))
+        self.btn_cancel = ctk.CTkButton(self.control_frame, text="⏹️ 取消", command=self.cancel_processing, width=110, state="disabled", fg_color="#C0392B", hover_color="#922B21")
+        self.btn_cancel.grid(row=0, column=1, padx=(5, 0))
+
+    def log_to_console(self, msg):
+        self.append_console([msg])
+
+    def append_console(self, lines):
+        """整批写入控制台并滚动一次，超出 CONSOLE_MAX_LINES 的最早行被丢弃"""
+        lines = lines[-CONSOLE_MAX_LINES:]
+        self.console_textbox.insert("end", "\n".join(lines) + "\n")
+        excess = int(self.console_textbox.index("end-1c").split(".")[0]) - 1 - CONSOLE_MAX_LINES
+        if excess > 0:
+            self.console_textbox.delete("1.0", f"{excess + 1}.0")
+        self.console_textbox.see("end")
+
+    def set_progress(self, value):
+        """工作线程只记录最新进度，由 poll_worker_updates 合并刷新"""
+        self.pending_progress = value
+
+    def poll_worker_updates(self):
+        """定时批量刷新工作线程的日志与进度，避免逐条 after() 挤占 Tk 事件循环"""
+        if self.log_channel is not None:
+            batch = self.log_channel.drain()
+            if batch:
+                self.append_console(batch)
+        value, self.pending_progress = self.pending_progress, None
+        if value is not None:
+            self.progress_bar.set(value)
+        self.after(LOG_POLL_MS, self.poll_worker_updates)
+
+    def begin_run(self, output_dir, save_log):
+        """任务开始：启用暂停 / 取消、清空控制台并打开日志通道 (save_log 时完整日志写入导出文件夹)"""
+        self.btn_pause.configure(state="normal", text="⏸️ 暂停")
+        self.btn_cancel.configure(state="normal")
+        self.progress_bar.set(0)
+        self.console_textbox.delete("1.0", "end")
+        log_path = os.path.join(output_dir, f"extract-log_{time.strftime('%Y%m%d-%H%M%S')}.txt") if save_log else None
+        self.log_channel = LogChannel(log_path)
+
+    def close_log_channel(self):
+        """任务结束：刷出剩余日志与进度，关闭日志文件，停用暂停 / 取消"""
+        if self.log_channel is not None:
+            batch = self.log_channel.close()
+            if batch:
+                self.append_console(batch)
+            if self.log_channel.log_path:
+                self.log_to_console(f"📝 完整日志已保存至: {self.log_channel.log_path}")
+            self.log_channel = None
+        value, self.pending_progress = self.pending_progress, None
+        if value is not None:
+            self.progress_bar.set(value)
+        self.btn_pause.configure(state="disabled", text="⏸️ 暂停")
+        self.btn_cancel.configure(state="disabled")
+
+    def toggle_pause(self):
+        control = self.processor.control
+        if control.paused:
+            control.resume()
+            self.btn_pause.configure(text="⏸️ 暂停")
+            self.log_to_console("▶️ 已继续处理。")
+        else:
+            control.pause()
+            self.btn_pause.configure(text="▶️ 继续")
+            self.log_to_console("⏸️ 已暂停：当前页完成后挂起，已排队的 OCR 识别照常完成。")
+
+    def cancel_processing(self):
+        self.btn_pause.configure(state="disabled")
+        self.btn_cancel.configure(state="disabled")
+        self.log_to_console("⏹️ 正在取消：在途页面完成后停止，文档句柄随之释放...")
+        self.processor.cancel()
+
+# ---------------------------------------------------------
+# 7. 无界面命令行 / 库入口 (批处理服务器无需显示器)
+# ---------------------------------------------------------
+EXIT_OK, EXIT_FAILED, EXIT_USAGE, EXIT_CANCELLED = 0, 1, 2, 130  # 供作业调度器判断的退出码
+
+def collect_pdf_paths(inputs):
+    """展开命令行输入：文件原样保留，目录取其中的 *.pdf (按文件名排序)，指向同一文件的输入只保留一个"""
+    pdf_paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pdf_paths.extend(os.path.join(item, name) for name in sorted(os.listdir(item)) if name.lower().endswith(".pdf"))
+        else:
+            pdf_paths.append(item)
+    return dedupe_pdf_paths(pdf_paths)
+
+def build_run_summary(pdf_paths, results, elapsed):
+    """汇总逐文件结果 (未开始即被中断的文件记为 cancelled)，用于 --json 输出"""
+    by_index = {r["index"]: r for r in results}
+    files = [by_index.get(k, dict(index=k, pdf=p, output=None, status="cancelled", error=None)) for k, p in enumerate(pdf_paths)]
+    count = lambda status: sum(1 for f in files if f["status"] == status)
+    return dict(total=len(files), succeeded=count("ok"), skipped=count("skipped"), failed=count("error"), cancelled=count("cancelled"),
+                elapsed_sec=round(elapsed, 3), files=files)
+
+def run_headless(worker, pdf_paths, as_json):
+    """同步运行 Worker 并按结果给出退出码；Ctrl+C 视为取消，仍输出已完成部分的汇总"""
+    start = time.perf_counter()
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.is_cancelled = True
+    summary = build_run_summary(pdf_paths, worker.results, time.perf_counter() - start)
+    if as_json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if summary["cancelled"]:
+        return EXIT_CANCELLED
+    return EXIT_FAILED if summary["failed"] else EXIT_OK
+
+def add_common_arguments(parser):
+    parser.add_argument("pdfs", nargs="+", help="PDF 文件或包含 PDF 的文件夹")
+    parser.add_argument("-o", "--output-dir", required=True, help="纯文本导出文件夹 (不存在时自动创建)")
+    parser.add_argument("--lang", default="eng+chi_sim", help="OCR 识别语言 (默认: eng+chi_sim)")
+    parser.add_argument("--threshold", type=int, default=50, help="扫描件判定阈值，页面文本少于该字符数时启用 OCR (默认: 50)")
+    parser.add_argument("--file-workers", type=int, default=1, help="并行文件数 (默认: 1)")
+    parser.add_argument("--ocr-workers", type=int, help="OCR 线程数 (默认: CPU 核数)")
+    parser.add_argument("--ocr-grayscale", action="store_true", help="OCR 以灰度渲染")
+    parser.add_argument("--ocr-adaptive-dpi", action="store_true", help="按页面尺寸与估算字号自动选择渲染倍率")
+    parser.add_argument("--ocr-regions-only", action="store_true", help="只 OCR 没有文本层的图片区域")
+    parser.add_argument("--no-resume", action="store_true", help="忽略输出目录中的批次清单，所有文件从头提取")
+    parser.add_argument("--json", action="store_true", help="结束后向 stdout 输出 JSON 汇总")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不向 stderr 输出处理日志")
+
+def build_arg_parser(description, cleaning_profile=DEFAULT_PROFILE.name):
+    """完整的命令行参数；cleaning_profile 为调用工具默认的清洗配置"""
+    parser = argparse.ArgumentParser(description=description)
+    add_common_arguments(parser)
+    parser.add_argument("--cleaning-profile", choices=sorted(PROFILES), default=cleaning_profile,
+                        help=f"清洗配置：各工具的块审查、阅读顺序与缝合规则 (默认: {cleaning_profile})")
+    parser.add_argument("--strict", action="store_true", help="关闭安全模式，启用短标题/署名句法过滤 (仅 i-love-pdf 配置区分)")
+    parser.add_argument("--page-workers", type=int, default=1, help="页面并行进程数 (默认: 1，即串行)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"提取缓存目录 (默认: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="不使用提取缓存")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="提取缓存容量上限 MB (默认: 1024)")
+    parser.add_argument("--memory-budget-mb", type=int, help="每个进程的常驻内存上限 MB，超出时释放缓存并排空 OCR 积压 (默认: 不限制)")
+    parser.add_argument("--no-repeat-scan", action="store_true", help="跳过文档级重复页眉/页脚预扫描，只用页边区域规则")
+    parser.add_argument("--format", choices=sorted(OUTPUT_WRITERS), default="txt",
+                        help="输出格式：txt 为缝合后的正文，jsonl 为逐块记录 (页码、坐标、文本、拦截原因、是否 OCR)；默认: txt")
+    parser.add_argument("--profile", metavar="REPORT.json", help="记录逐页各阶段耗时与拦截计数，批次结束写出 JSON 性能报告")
+    return parser
+
+def worker_options_from_args(args):
+    return dict(safe_mode=not args.strict, page_workers=args.page_workers, file_workers=args.file_workers,
+                ocr_workers=args.ocr_workers, ocr_grayscale=args.ocr_grayscale, ocr_adaptive_dpi=args.ocr_adaptive_dpi,
+                ocr_regions_only=args.ocr_regions_only, cache_dir=None if args.no_cache else args.cache_dir,
+                cache_max_mb=args.cache_max_mb, profile_path=args.profile,
+                memory_budget_mb=args.memory_budget_mb, resume=not args.no_resume, repeat_scan=not args.no_repeat_scan,
+                output_format=args.format, cleaning_profile=args.cleaning_profile)
+
+def run_cli(argv, description, cleaning_profile=DEFAULT_PROFILE.name, launch_gui=None):
+    """各工具 main() 的共用实现：无参数时调用 launch_gui 启动图形界面；带参数时以无界面模式运行并返回退出码"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv and launch_gui is not None:
+        launch_gui()
+        return EXIT_OK
+    parser = build_arg_parser(description, cleaning_profile)
+    args = parser.parse_args(argv)
+    pdf_paths = collect_pdf_paths(args.pdfs)
+    if not pdf_paths:
+        parser.error("没有找到任何 PDF 文件")
+    os.makedirs(args.output_dir, exist_ok=True)
+    log_callback = (lambda msg: None) if args.quiet else (lambda msg: print(msg, file=sys.stderr, flush=True))
+    worker = PDFProcessorWorker(
+        pdf_paths=pdf_paths,
+        output_dir=args.output_dir,
+        scan_threshold=args.threshold,
+        ocr_lang=args.lang,
+        gui_callback=lambda v: None,
+        log_callback=log_callback,
+        finish_callback=lambda: None,
+        **worker_options_from_args(args)
+    )
+    return run_headless(worker, pdf_paths, args.json)
+
+def main(argv=None):
+    """直接运行核心模块：无界面模式，--cleaning-profile 选择清洗配置"""
+    return run_cli(argv, "PDF 提取共用核心 (无界面模式)：按所选清洗配置批量提取 PDF 正文为纯文本")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包为 EXE 后进程池子进程需要
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+CSV 转 Word 流式读取回归测试：参照规模与 10 倍规模的同一份合成语料分别在独立子进程中经 convert_csv 转换，
+断言峰值 RSS 与输入大小无关，且分卷数与表格的行数、单元格数与输入一致
+
+子进程复用 benchmarks/bench_csv_streaming.py 的 --child 入口；完整规模 (500 万行) 的校验仍由该脚本完成。
+"""
+import os
+import re
+import sys
+import glob
+import json
+import zipfile
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+from _common import make_segment_csv
+
+BENCH_SCRIPT = os.path.join(ROOT_DIR, "benchmarks", "bench_csv_streaming.py")
+REFERENCE_ROWS = 5000  # 恰好一个满分卷 (PART_CELL_BUDGET / COLUMNS)；参照规模不足一卷时测不到单卷的工作集
+SCALE = 10
+COLUMNS = 10
+RSS_MARGIN_MB = 32
+
+def convert_in_child(csv_path):
+    """在独立子进程中流式转换，返回其回报的 (行数、分卷数、峰值 RSS)"""
+    proc = subprocess.run([sys.executable, BENCH_SCRIPT, "--child", csv_path, "stream", "1"],
+                          capture_output=True, text=True, cwd=os.path.dirname(BENCH_SCRIPT))
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def count_table(docx_path):
+    """统计分卷正文表格的 (行数, 单元格数)，直接数 document.xml 中的 <w:tr> / <w:tc>，不经 python-docx 逐格载入"""
+    with zipfile.ZipFile(docx_path) as z:
+        xml = z.read("word/document.xml").decode("utf-8")
+    return len(re.findall(r"<w:tr[ >]", xml)), len(re.findall(r"<w:tc[ >]", xml))
+
+@pytest.fixture(scope="module")
+def conversions(tmp_path_factory):
+    """参照规模与 10 倍规模各转换一次：行数 -> (子进程回报的结果, 生成的分卷路径)"""
+    runs = {}
+    for rows in (REFERENCE_ROWS, REFERENCE_ROWS * SCALE):
+        work_dir = tmp_path_factory.mktemp(f"rows{rows}")
+        result = convert_in_child(make_segment_csv(str(work_dir / "segments.csv"), rows, COLUMNS))
+        runs[rows] = result, sorted(glob.glob(str(work_dir / "segments_排版输出_Part*.docx")))
+    return runs
+
+@pytest.mark.parametrize("rows", [REFERENCE_ROWS, REFERENCE_ROWS * SCALE])
+def test_parts_match_input(rows, conversions):
+    result, parts = conversions[rows]
+    assert result["rows"] == rows
+    assert result["parts"] == len(parts) > 0
+    table_rows, cells = map(sum, zip(*(count_table(p) for p in parts)))
+    # 每个分卷各有一行表头
+    assert table_rows == rows + len(parts)
+    assert cells == (rows + len(parts)) * COLUMNS
+
+def test_peak_rss_is_independent_of_input_size(conversions):
+    reference, scaled = (conversions[rows][0]["peak_rss_mb"] for rows in (REFERENCE_ROWS, REFERENCE_ROWS * SCALE))
+    assert scaled - reference < RSS_MARGIN_MB
@@ -0,0 +1,50 @@
+"""
+内存受限回归测试：无持久化缓存 (cache_dir=None) 时用 run_headless 提取上千页的合成 PDF，断言进程常驻内存的增长不超过固定预算
+
+完整规模 (10,000 页，各工具独立子进程、峰值 RSS) 的校验见 benchmarks/bench_memory_bounded.py。
+PyMuPDF 1.28 的 get_text("blocks") 会泄漏每个文本块的引用 (约每页数 KB)，预算为此留有余量；
+整份文档的页面记录、OCR 位图或正文滞留在内存中时会明显超出。
+"""
+import os
+import sys
+
+import fitz  # PyMuPDF
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+import pdf_core
+from _common import make_text_pdf
+
+PAGES = 1500
+SOURCE_PAGES = 50  # 先排版这么多页，再复制拼接到 PAGES 页 (逐页排版上千页要十几秒)
+RSS_GROWTH_LIMIT_MB = 32
+
+@pytest.fixture(scope="module")
+def large_pdf(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("large")
+    source = fitz.open(make_text_pdf(str(tmp / "source.pdf"), SOURCE_PAGES))
+    out = fitz.open()
+    while len(out) < PAGES:
+        out.insert_pdf(source, to_page=min(SOURCE_PAGES, PAGES - len(out)) - 1)
+    path = str(tmp / "large.pdf")
+    out.save(path, deflate=True, no_new_id=True)
+    out.close()
+    source.close()
+    return path
+
+@pytest.mark.skipif(pdf_core.current_rss_mb() is None, reason="需要 psutil 或 /proc 才能读取当前 RSS")
+@pytest.mark.parametrize("profile", sorted(pdf_core.PROFILES))
+def test_rss_growth_is_bounded(profile, large_pdf, tmp_path):
+    baseline_mb = pdf_core.current_rss_mb()
+    peak_mb = [baseline_mb]
+
+    def sample(_fraction):
+        peak_mb[0] = max(peak_mb[0], pdf_core.current_rss_mb())
+
+    worker = pdf_core.PDFProcessorWorker([large_pdf], str(tmp_path), 50, "eng", True, sample, lambda msg: None, lambda: None,
+                                         cache_dir=None, cleaning_profile=profile)
+    assert pdf_core.run_headless(worker, [large_pdf], False) == pdf_core.EXIT_OK
+    assert [r["status"] for r in worker.results] == ["ok"]
+    assert peak_mb[0] - baseline_mb < RSS_GROWTH_LIMIT_MB
@@ -0,0 +1,94 @@
+"""
+三种清洗配置的输出回归测试：用 benchmarks/_common 的合成语料跑各工具的命令行入口，与重构前脚本导出的黄金输出逐字节比对
+
+扫描页的 OCR 由放在 PATH 最前面的假 tesseract 返回固定文字，结果不依赖本机 Tesseract 的版本与语言包 (Windows 下跳过含扫描页的语料)。
+黄金输出 tests/golden/<配置>-<语料>.txt 由重构前 (共用核心 pdf_core 拆分之前) 的三个工具脚本以同样的语料与参数生成。
+"""
+import os
+import sys
+import glob
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmarks"))
+from _common import make_text_pdf, make_two_column_pdf, make_mixed_pdf
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+TOOLS = {  # 清洗配置 -> 工具脚本
+    "i-love-pdf": "I-LOVE-PDF.py",
+    "clean-pdf": "clean-pdf.py",
+    "ultimate-pro": "Ultimate_PDF_Extractor-pro.py",
+}
+CORPUS = {  # 语料名称 -> (生成函数, 是否含扫描页)；页数很少，整套测试几十秒内跑完
+    "text": (lambda path: make_text_pdf(path, 4), False),
+    "two-column": (lambda path: make_two_column_pdf(path, 4), False),
+    "mixed": (lambda path: make_mixed_pdf(path, 4, scan_ratio=0.5), True),  # 第 4 页为扫描页
+}
+# 假 tesseract：按 pytesseract 的调用方式 (tesseract 输入图片 输出前缀 ...) 写出固定的识别结果，
+# 其中的页眉、断词与页码行用来覆盖各配置对 OCR 文本的清洗与缝合
+FAKE_TESSERACT = """#!/bin/sh
+if [ "$1" = "--version" ]; then echo "tesseract 5.3.0"; exit 0; fi
+cat > "$2.txt" <<'EOF'
+Journal of Localization Studies
+
+Scanned page para-
+graph without end
+
+continued lower case.
+
+7
+EOF
+"""
+
+@pytest.fixture(scope="module")
+def corpus_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp("corpus")
+    for name, (make, _) in CORPUS.items():
+        make(str(path / f"{name}.pdf"))
+    return path
+
+@pytest.fixture(scope="module")
+def ocr_env(tmp_path_factory):
+    """PATH 最前面放入假 tesseract 的环境变量；Windows 下无法执行 shell 脚本，返回 None"""
+    if os.name == "nt":
+        return None
+    bin_dir = tmp_path_factory.mktemp("bin")
+    fake = bin_dir / "tesseract"
+    fake.write_text(FAKE_TESSERACT)
+    fake.chmod(0o755)
+    return dict(os.environ, PATH=str(bin_dir) + os.pathsep + os.environ.get("PATH", ""))
+
+def run_tool(argv, out_dir, env):
+    """在子进程中运行工具命令行 (不读写提取缓存)，返回导出的唯一一个 txt 的内容 (bytes)"""
+    subprocess.run([sys.executable] + argv + ["-o", str(out_dir), "--quiet", "--no-cache"],
+                   env=env, check=True, capture_output=True)
+    outputs = glob.glob(os.path.join(str(out_dir), "*.txt"))
+    assert len(outputs) == 1, outputs
+    with open(outputs[0], "rb") as f:
+        return f.read()
+
+def read_golden(profile, corpus):
+    with open(os.path.join(GOLDEN_DIR, f"{profile}-{corpus}.txt"), "rb") as f:
+        return f.read()
+
+def pdf_for(corpus, corpus_dir, ocr_env):
+    if CORPUS[corpus][1] and ocr_env is None:
+        pytest.skip("假 tesseract 为 shell 脚本，仅在 POSIX 系统上运行")
+    return str(corpus_dir / f"{corpus}.pdf")
+
+@pytest.mark.parametrize("corpus", CORPUS)
+@pytest.mark.parametrize("profile", TOOLS)
+def test_tool_matches_golden(profile, corpus, corpus_dir, ocr_env, tmp_path):
+    pdf_path = pdf_for(corpus, corpus_dir, ocr_env)
+    output = run_tool([os.path.join(ROOT_DIR, TOOLS[profile]), pdf_path], tmp_path, ocr_env)
+    assert output == read_golden(profile, corpus)
+
+@pytest.mark.parametrize("corpus", CORPUS)
+@pytest.mark.parametrize("profile", TOOLS)
+def test_core_profile_matches_golden(profile, corpus, corpus_dir, ocr_env, tmp_path):
+    """共用核心直接按 --cleaning-profile 选择配置，输出与对应工具脚本相同"""
+    pdf_path = pdf_for(corpus, corpus_dir, ocr_env)
+    output = run_tool([os.path.join(ROOT_DIR, "pdf_core.py"), pdf_path, "--cleaning-profile", profile], tmp_path, ocr_env)
+    assert output == read_golden(profile, corpus)
@@ -0,0 +1,26 @@
+"""跨页重复块索引：带页码的页眉 / 页脚按位置判定为重复，同一位置反复出现的纯数字块 (表格数值、单独的页码) 不参与判定"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from pdf_core import RepeatingBlockIndex
+
+def text_block(x0, y0, text):
+    return (x0, y0, x0 + 150, y0 + 10, text, 0, 0)
+
+def build_index(pages):
+    index = RepeatingBlockIndex()
+    for i, blocks in enumerate(pages):
+        index.add_page(i, RepeatingBlockIndex.page_keys(blocks))
+    return index.finalize()
+
+def test_numbered_header_is_repeating():
+    index = build_index([[text_block(72, 30, f"Page {i + 1}")] for i in range(8)])
+    assert index.is_repeating(text_block(72, 30, "Page 99"))
+
+def test_numeric_cells_are_not_repeating():
+    index = build_index([[text_block(300, 400, f"{i * 7.5}"), text_block(300, 420, "(12)")] for i in range(8)])
+    assert not index.is_repeating(text_block(300, 400, "45.0"))
+    assert not index.is_repeating(text_block(300, 420, "(12)"))
+    assert RepeatingBlockIndex.block_key(text_block(300, 400, "— 12 —")) is None